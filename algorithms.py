@@ -1,54 +1,38 @@
-from typing import List
+import sys
+from typing import Optional, TextIO, Union
+import euler
+import hamilton
+import instrumentation
 from graph import UndirectedGraph
+from compact_graph import CompactGraph, freeze
 
 
-def find_euler_cycle(graph: UndirectedGraph):
-    if not graph.is_all_degrees_even():
-        print("Euler cycle does not exist: not all degrees are even.")
-        return
-
-    graph_copy = {u: set(v) for u, v in graph.adjacency_list.items()}
-    stack = [0]
-    path = []
-
-    while stack:
-        current = stack[-1]
-        if graph_copy[current]:
-            neighbor = graph_copy[current].pop()
-            graph_copy[neighbor].remove(current)
-            stack.append(neighbor)
+def find_euler_cycle(graph: Union[UndirectedGraph, CompactGraph], stream: Optional[TextIO] = None):
+    graph = freeze(graph)
+    if not graph.is_eulerian():
+        if graph.edges_connected():
+            print("Euler cycle does not exist: not all degrees are even.")
         else:
-            path.append(stack.pop())
+            print("Euler cycle does not exist: edges are not connected.")
+        return
 
     print("Euler cycle:")
-    print(" -> ".join(map(str, path[::-1])))
-
-def find_hamilton_cycle(graph: UndirectedGraph):
-    def backtrack(current: int, visited: List[bool], path: List[int]) -> bool:
-        if len(path) == graph.num_nodes:
-            if path[0] in graph.adjacency_list[path[-1]]:
-                path.append(path[0])
-                return True
-            return False
-
-        for neighbor in graph.adjacency_list[current]:
-            if not visited[neighbor]:
-                visited[neighbor] = True
-                path.append(neighbor)
-                if backtrack(neighbor, visited, path):
-                    return True
-                visited[neighbor] = False
-                path.pop()
-
-        return False
-
-    for start_node in range(graph.num_nodes):
-        visited = [False] * graph.num_nodes
-        path = [start_node]
-        visited[start_node] = True
-        if backtrack(start_node, visited, path):
-            print("Hamilton cycle:")
-            print(" -> ".join(map(str, path)))
-            return
-
-    print("No Hamilton cycle found.")
+    with instrumentation.stage("euler"):
+        written = euler.write_euler_cycle(graph, stream or sys.stdout)
+    if instrumentation.enabled:
+        instrumentation.count("euler.vertices_written", written)
+
+def find_hamilton_cycle(graph: Union[UndirectedGraph, CompactGraph], method: str = "auto",
+                        time_limit: Optional[float] = None, progress=None, certificate=None):
+    with instrumentation.stage("hamilton"):
+        result = hamilton.search(graph, method, time_limit=time_limit, progress=progress,
+                                 certificate=certificate)
+    if result.status == hamilton.FOUND:
+        print("Hamilton cycle:")
+        print(" -> ".join(map(str, result.cycle)))
+    elif result.status == hamilton.UNKNOWN:
+        print(f"Hamilton cycle search gave up after {result.stats.elapsed:.2f}s "
+              f"({result.stats.nodes} nodes expanded).")
+    else:
+        print("No Hamilton cycle found.")
+    return result
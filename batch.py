@@ -0,0 +1,142 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import bench
+import hamilton
+
+ALGORITHMS = ("euler", "hamilton")
+# Ułamek limitu zadania oddawany wyszukiwaniu Hamiltona, żeby zwykle kończyło się
+# wynikiem "unknown" zanim zadziała twardy limit sygnałem.
+HAMILTON_SHARE = 0.9
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def _alarm(signum, frame):
+    raise JobTimeout()
+
+
+def job_seed(master_seed: int, index: int) -> int:
+    # Niezależny strumień na zadanie: ziarno zależy tylko od ziarna głównego
+    # i numeru zadania, nie od kolejności wykonania w puli.
+    return random.Random(f"{master_seed}:{index}").getrandbits(63)
+
+
+def expand_jobs(spec: dict) -> list:
+    # Specyfikacja: lista "jobs" albo siatka "grid" {n, saturation, mode, repeats};
+    # pozostałe klucze (impl, algorithms, timeout, method, certificate) to wartości domyślne,
+    # a "seed" to ziarno główne, z którego wyprowadzane są ziarna zadań.
+    defaults = {key: value for key, value in spec.items() if key not in ("jobs", "grid", "seed")}
+    jobs = [dict(defaults, **job) for job in spec.get("jobs", [])]
+    grid = spec.get("grid")
+    if grid:
+        for n, saturation, mode in itertools.product(grid["n"], grid["saturation"], grid["mode"]):
+            for _ in range(grid.get("repeats", 1)):
+                jobs.append(dict(defaults, n=n, saturation=saturation, mode=mode))
+    master_seed = spec.get("seed", 0)
+    for index, job in enumerate(jobs):
+        job["id"] = index
+        job.setdefault("seed", job_seed(master_seed, index))
+    return jobs
+
+
+def _error_row(job: dict, status: str, message: str) -> dict:
+    return {"id": job["id"], "impl": job.get("impl", "generowanie"), "n": job.get("n"),
+            "saturation": job.get("saturation"), "mode": job.get("mode"), "seed": job.get("seed"),
+            "method": job.get("method", "auto"), "status": status, "error": message}
+
+
+def run_job(job: dict) -> dict:
+    timeout = job.get("timeout")
+    hamilton_limit = job.get("hamilton_time_limit")
+    if hamilton_limit is None and timeout:
+        hamilton_limit = timeout * HAMILTON_SHARE
+    use_alarm = timeout and hasattr(signal, "setitimer")
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        row = bench.run_instance(job.get("impl", "generowanie"), job["n"], job["saturation"],
+                                 job["mode"], job["seed"], job.get("method", "auto"),
+                                 hamilton_limit, job.get("algorithms", ALGORITHMS),
+                                 certificate=job.get("certificate", False))
+    except JobTimeout:
+        row = _error_row(job, "timeout", "timeout")
+    except Exception as e:
+        # Błąd jednego zadania (np. metoda nieobsługująca danego n) nie przerywa serii.
+        row = _error_row(job, "error", f"{type(e).__name__}: {e}")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    row["id"] = job["id"]
+    row["elapsed"] = time.perf_counter() - start
+    return row
+
+
+def run_batch(jobs: list, workers: int = None, stream=sys.stdout) -> int:
+    # Wyniki wypisywane jako linie JSON w kolejności ukończenia zadań.
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except Exception as e:
+                # Np. proces roboczy zabity przez system - błąd tylko tego zadania.
+                row = _error_row(futures[future], "error", f"{type(e).__name__}: {e}")
+            stream.write(json.dumps(row) + "\n")
+            stream.flush()
+            done += 1
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wsadowe uruchamianie generowania i algorytmów w puli procesów.")
+    parser.add_argument("spec", nargs="?", help="Plik JSON ze specyfikacją zadań")
+    parser.add_argument("--nodes", type=int, nargs="+", help="Siatka: liczby wierzchołków")
+    parser.add_argument("--saturations", type=int, nargs="+", default=[30, 50, 70])
+    parser.add_argument("--modes", nargs="+", choices=["hamil", "non-hamil"], default=["hamil", "non-hamil"])
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--impl", choices=bench.IMPLEMENTATIONS, default="generowanie")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--method", choices=["auto", *hamilton.METHODS], default="auto")
+    parser.add_argument("--certificate", action="store_true",
+                        help="Przyjmij zasiany cykl Hamiltona zamiast wyszukiwania, gdy jest nadal poprawny")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Limit czasu jednego zadania w sekundach")
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno główne")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", help="Plik wynikowy (domyślnie standardowe wyjście)")
+    args = parser.parse_args()
+
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+    elif args.nodes:
+        spec = {"grid": {"n": args.nodes, "saturation": args.saturations, "mode": args.modes,
+                         "repeats": args.repeats},
+                "impl": args.impl, "algorithms": args.algorithms, "method": args.method,
+                "certificate": args.certificate, "timeout": args.timeout, "seed": args.seed}
+    else:
+        parser.error("Podaj plik specyfikacji albo --nodes")
+    jobs = expand_jobs(spec)
+    if args.output:
+        with open(args.output, "w") as f:
+            done = run_batch(jobs, args.workers, f)
+    else:
+        done = run_batch(jobs, args.workers)
+    print(f"Zakończono {done} zadań.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
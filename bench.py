@@ -0,0 +1,174 @@
+import argparse
+import csv
+import json
+import random
+import statistics
+import sys
+import time
+
+import euler
+import generowanie_grafu
+import generowanie_wsadowe
+import hamilton
+from compact_graph import freeze
+from graph import UndirectedGraph
+
+STAGES = ("generation", "parity", "connectivity", "isolation", "euler", "hamilton")
+IMPLEMENTATIONS = ("generowanie", "graph", "wsadowe")
+
+
+def _timed(times: dict, stage: str, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    times[stage] = time.perf_counter() - start
+    return result
+
+
+def _generate(impl: str, n: int, saturation: int, mode: str, seed: int, times: dict):
+    random.seed(seed)
+    if impl == "generowanie":
+        graph = generowanie_grafu.Graph(n)
+
+        def generation():
+            graph.generate_hamiltonian_cycle()
+            graph.add_edges_with_triangles(saturation / 100)
+
+        _timed(times, "generation", generation)
+        _timed(times, "parity", graph.parzyste_stopnie)
+        _timed(times, "connectivity", graph.zapewnienie_spojnosci)
+        if mode == "non-hamil":
+            _timed(times, "isolation", graph.non_hamilton)
+        return graph
+    if impl == "graph":
+        graph = UndirectedGraph(n)
+
+        def generation():
+            graph.generate_hamiltonian_cycle()
+            graph.fill_to_saturation(saturation)
+
+        _timed(times, "generation", generation)
+        if mode == "hamil":
+            _timed(times, "parity", graph.add_short_cycles_for_even_degrees)
+        else:
+            _timed(times, "isolation", graph.isolate_node)
+        return graph
+    if impl == "wsadowe":
+        return _timed(times, "generation", generowanie_wsadowe.generowanie_wsadowe,
+                      n, saturation / 100, mode, seed)
+    raise ValueError(f"Nieznana implementacja: {impl}")
+
+
+def run_instance(impl: str, n: int, saturation: int, mode: str, seed: int,
+                 hamilton_method: str = "auto", hamilton_time_limit: float = None,
+                 algorithms=("euler", "hamilton"), certificate: bool = False) -> dict:
+    times = {}
+    row = {"impl": impl, "n": n, "saturation": saturation, "mode": mode, "seed": seed}
+    try:
+        graph = _generate(impl, n, saturation, mode, seed, times)
+    except (ValueError, RuntimeError) as e:
+        # Np. parzystość nieosiągalna przy małym n - instancja bez pomiarów.
+        row["error"] = str(e)
+        for stage in STAGES:
+            row[stage] = None
+        return row
+    frozen = freeze(graph)
+    row["edges"] = frozen.edge_count()
+    if "euler" in algorithms and frozen.is_eulerian():
+        row["euler_length"] = _timed(times, "euler", lambda: sum(1 for _ in euler.iter_euler_cycle(frozen)))
+    if "hamilton" in algorithms:
+        # certificate: zasiany cykl, jeśli nadal poprawny, zastępuje wyszukiwanie.
+        result = _timed(times, "hamilton", lambda: hamilton.search(frozen, hamilton_method, hamilton_time_limit,
+                                                                   certificate="auto" if certificate else None))
+        row["hamilton_status"] = result.status
+        row["hamilton_nodes"] = result.stats.nodes
+        row["hamilton_reason"] = result.reason
+    for stage in STAGES:
+        row[stage] = times.get(stage)
+    return row
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(rows, label: str = "") -> list:
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["impl"], row["n"], row["saturation"], row["mode"]), []).append(row)
+    summary = []
+    for (impl, n, saturation, mode), group in groups.items():
+        for stage in STAGES:
+            values = [row[stage] for row in group if row[stage] is not None]
+            if not values:
+                continue
+            summary.append({
+                "label": label, "impl": impl, "n": n, "saturation": saturation, "mode": mode,
+                "stage": stage, "repeats": len(values),
+                "median": statistics.median(values), "p10": _percentile(values, 0.1),
+                "p90": _percentile(values, 0.9), "min": min(values), "max": max(values),
+            })
+    return summary
+
+
+def _write(rows: list, filename: str):
+    if filename.endswith(".json"):
+        with open(filename, "w") as f:
+            json.dump(rows, f, indent=1)
+        return
+    fields = []
+    for row in rows:
+        fields.extend(key for key in row if key not in fields)
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pomiary generowania oraz cykli Eulera i Hamiltona.")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[20, 40, 80])
+    parser.add_argument("--saturations", type=int, nargs="+", default=[30, 50, 70])
+    parser.add_argument("--modes", nargs="+", choices=["hamil", "non-hamil"], default=["hamil", "non-hamil"])
+    parser.add_argument("--impl", nargs="+", choices=IMPLEMENTATIONS, default=["generowanie"])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hamilton-method", choices=["auto", *hamilton.METHODS], default="auto")
+    parser.add_argument("--hamilton-time-limit", type=float, default=10.0)
+    parser.add_argument("--certificate", action="store_true",
+                        help="Przyjmij zasiany cykl Hamiltona zamiast wyszukiwania, gdy jest nadal poprawny")
+    parser.add_argument("--label", default="", help="Etykieta wersji kodu dopisywana do wyników")
+    parser.add_argument("--out", default="bench.csv", help="Podsumowanie (.csv lub .json)")
+    parser.add_argument("--raw", help="Surowe pomiary każdego powtórzenia (.csv lub .json)")
+    args = parser.parse_args()
+
+    rows = []
+    instance = 0
+    for impl in args.impl:
+        for n in args.nodes:
+            for saturation in args.saturations:
+                for mode in args.modes:
+                    for repeat in range(args.warmup + args.repeats):
+                        # Ziarno zależy tylko od ziarna bazowego i numeru instancji,
+                        # więc ten sam przebieg daje te same grafy w każdej wersji kodu.
+                        seed = args.seed * 1_000_003 + instance
+                        instance += 1
+                        row = run_instance(impl, n, saturation, mode, seed,
+                                           args.hamilton_method, args.hamilton_time_limit,
+                                           certificate=args.certificate)
+                        if repeat >= args.warmup:
+                            row["label"] = args.label
+                            rows.append(row)
+                    print(f"{impl} n={n} {saturation}% {mode}: gotowe", file=sys.stderr)
+
+    _write(summarize(rows, args.label), args.out)
+    if args.raw:
+        _write(rows, args.raw)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import io
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Iterable, List, Mapping, Optional, TextIO
+
+import euler
+import hamilton
+import matrices
+import tikz
+from union_find import DisjointSet
+
+# Wyrenderowane macierze do tylu komórek trzymane jako tekst; większe są zawsze
+# strumieniowane od nowa, żeby pamięć podręczna nie przerosła samego grafu.
+RENDER_CACHE_CELLS = 4_000_000
+
+
+class CompactGraph:
+    # Niemutowalny graf w formacie CSR: sąsiedzi wierzchołka v (etykiety)
+    # leżą posortowani w targets[offsets[v - base]:offsets[v - base + 1]].
+    def __init__(self, n: int, offsets, targets, base: int = 0,
+                 hamiltonian_cycle: Optional[List[int]] = None):
+        self.n = n
+        self.base = base
+        self.offsets = offsets
+        self.targets = targets
+        self.hamiltonian_cycle = list(hamiltonian_cycle or [])
+        self.metadata = {}
+        # Źródło buforów (np. mmap z graph_format.load_graph) trzymane przy życiu razem z grafem.
+        self.mapping = None
+        # Reprezentacje pochodne budowane przy pierwszym użyciu; graf jest niemutowalny,
+        # więc nigdy nie wymagają unieważnienia.
+        self._bitsets = None
+        self._components = None
+        self._degrees = None
+        self._edge_list = None
+        self._adjacency_list = None
+        self._rendered = {}
+
+    def __getstate__(self):
+        # Widoki na mmap nie dają się serializować - do innego procesu idą kopie.
+        state = dict(self.__dict__)
+        state["offsets"] = array('q', self.offsets)
+        state["targets"] = array('i', self.targets)
+        state["mapping"] = None
+        state["_rendered"] = {}
+        return state
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Mapping[int, Iterable[int]], n: int, base: int = 0,
+                       hamiltonian_cycle: Optional[List[int]] = None) -> "CompactGraph":
+        offsets = array('q', [0])
+        targets = array('i')
+        for v in range(base, base + n):
+            targets.extend(sorted(adjacency.get(v, ())))
+            offsets.append(len(targets))
+        return cls(n, offsets, targets, base, hamiltonian_cycle)
+
+    @classmethod
+    def from_edge_arrays(cls, us, vs, n: int, base: int = 0) -> "CompactGraph":
+        # Budowa CSR z dwóch tablic końców krawędzi (bez pętli własnych): zliczenie
+        # stopni, rozłożenie obu kierunków, a potem sortowanie i usunięcie
+        # duplikatów w obrębie każdego wiersza.
+        degree = array('q', bytes(8 * n))
+        for v, count in Counter(us).items():
+            degree[v - base] += count
+        for v, count in Counter(vs).items():
+            degree[v - base] += count
+        cursor = array('q', [0]) * n
+        total = 0
+        for i in range(n):
+            cursor[i] = total
+            total += degree[i]
+        bounds = array('q', cursor)
+        bounds.append(total)
+        raw = array('i', bytes(4 * total))
+        for u, v in zip(us, vs):
+            i, j = u - base, v - base
+            raw[cursor[i]] = v
+            cursor[i] += 1
+            raw[cursor[j]] = u
+            cursor[j] += 1
+        offsets = array('q', [0])
+        targets = array('i')
+        for i in range(n):
+            targets.extend(sorted(set(raw[bounds[i]:bounds[i + 1]])))
+            offsets.append(len(targets))
+        return cls(n, offsets, targets, base)
+
+    @property
+    def num_nodes(self) -> int:
+        return self.n
+
+    def vertices(self) -> range:
+        return range(self.base, self.base + self.n)
+
+    def neighbors(self, v: int):
+        i = v - self.base
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def vertex_degree(self, v: int) -> int:
+        i = v - self.base
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def has_edge(self, u: int, v: int) -> bool:
+        i = u - self.base
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        pos = bisect_left(self.targets, v, lo, hi)
+        return pos < hi and self.targets[pos] == v
+
+    def edge_count(self) -> int:
+        return len(self.targets) // 2
+
+    def degrees(self) -> array:
+        if self._degrees is None:
+            offsets = self.offsets
+            self._degrees = array('q', (offsets[i + 1] - offsets[i] for i in range(self.n)))
+        return self._degrees
+
+    def components(self) -> DisjointSet:
+        # Prosto po CSR, każda para raz (u < v) - bez budowania listy krawędzi.
+        if self._components is None:
+            dsu = DisjointSet(self.n, self.base)
+            offsets, targets = self.offsets, self.targets
+            for i in range(self.n):
+                u = i + self.base
+                end = offsets[i + 1]
+                for k in range(bisect_right(targets, u, offsets[i], end), end):
+                    dsu.union(u, targets[k])
+            self._components = dsu
+        return self._components
+
+    def is_connected(self) -> bool:
+        return self.components().count <= 1
+
+    def edges_connected(self) -> bool:
+        isolated = self.degrees().count(0)
+        return self.components().count - isolated <= 1
+
+    def is_eulerian(self) -> bool:
+        return all(d % 2 == 0 for d in self.degrees()) and self.edges_connected()
+
+    def bitset_rows(self) -> List[int]:
+        # Wiersz v jako liczba całkowita: bit (w - base) ustawiony dla każdego sąsiada w.
+        if self._bitsets is None:
+            rows = []
+            for v in self.vertices():
+                row = bytearray(b'0') * self.n
+                for w in self.neighbors(v):
+                    row[self.n - 1 - (w - self.base)] = ord('1')
+                rows.append(int(row, 2) if self.n else 0)
+            self._bitsets = rows
+        return self._bitsets
+
+    def get_edge_list(self):
+        if self._edge_list is None:
+            self._edge_list = [(u, v) for u in self.vertices() for v in self.neighbors(u) if u < v]
+        return self._edge_list
+
+    def get_adjacency_list(self):
+        if self._adjacency_list is None:
+            self._adjacency_list = {v: list(self.neighbors(v)) for v in self.vertices()}
+        return self._adjacency_list
+
+    def _write_rendered(self, key, cells: int, render, stream: TextIO):
+        text = self._rendered.get(key)
+        if text is None:
+            if cells > RENDER_CACHE_CELLS:
+                render(self, stream)
+                return
+            buffer = io.StringIO()
+            render(self, buffer)
+            text = self._rendered[key] = buffer.getvalue()
+        stream.write(text)
+
+    def get_adjacency_matrix(self, stream: Optional[TextIO] = None):
+        self._write_rendered("adjacency", self.n * self.n, matrices.write_adjacency_matrix, stream or sys.stdout)
+
+    def get_incidence_matrix(self, stream: Optional[TextIO] = None, fmt: str = "dense"):
+        cells = self.n * self.edge_count() if fmt == "dense" else len(self.targets)
+        self._write_rendered(("incidence", fmt), cells,
+                             lambda g, out: matrices.write_incidence_matrix(g, out, fmt), stream or sys.stdout)
+
+    def export_to_tikz(self, filename: Optional[str] = None, max_edges: Optional[int] = None,
+                       layout: str = "circle"):
+        if filename:
+            tikz.export_tikz(self, filename, max_edges, layout)
+        else:
+            tikz.write_tikz(self, sys.stdout, max_edges, layout)
+
+    def euler_cycle(self) -> Optional[List[int]]:
+        if not self.is_eulerian():
+            return None
+        return list(euler.iter_euler_cycle(self))
+
+    def hamilton_cycle(self, method: str = "auto") -> Optional[List[int]]:
+        return hamilton.hamilton_cycle(self, method)
+
+    def find_euler_cycle(self, stream: Optional[TextIO] = None, cache=None):
+        if cache is not None:
+            cycle = cache.euler_cycle(self)
+        elif self.is_eulerian():
+            cycle = euler.iter_euler_cycle(self)
+        else:
+            cycle = None
+        if cycle is None:
+            print("Graf nie ma cyklu Eulera!")
+            return
+        print("Cykl Eulera:")
+        euler.write_cycle(cycle, stream or sys.stdout)
+
+    def find_hamilton_cycle(self, method: str = "auto", time_limit: Optional[float] = None, progress=None,
+                            cache=None):
+        if cache is not None:
+            result = cache.hamilton(self, method, time_limit=time_limit, progress=progress)
+        else:
+            result = hamilton.search(self, method, time_limit=time_limit, progress=progress)
+        if result.status == hamilton.FOUND:
+            print("Cykl Hamiltona:")
+            print(" -> ".join(map(str, result.cycle)))
+        elif result.status == hamilton.UNKNOWN:
+            print(f"Nie rozstrzygnięto w limicie ({result.stats}).")
+        else:
+            print("Nie znaleziono cyklu Hamiltona.")
+        return result
+
+
+def freeze(graph) -> CompactGraph:
+    if isinstance(graph, CompactGraph):
+        return graph
+    # Zamrożona kopia zapamiętana w grafie razem z jego wersją; każda mutacja
+    # zwiększa version, więc nieaktualna kopia jest po prostu budowana od nowa.
+    version = getattr(graph, "version", None)
+    cached = getattr(graph, "_frozen", None)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    # generowanie_grafu.Graph: wierzchołki 1..n
+    if hasattr(graph, "adjacency"):
+        g = CompactGraph.from_adjacency(graph.adjacency, graph.n, base=1,
+                                        hamiltonian_cycle=graph.hamiltonian_cycle)
+    # graph.UndirectedGraph: wierzchołki 0..n-1
+    elif hasattr(graph, "adjacency_list"):
+        g = CompactGraph.from_adjacency(graph.adjacency_list, graph.num_nodes, base=0,
+                                        hamiltonian_cycle=graph.hamiltonian_cycle)
+    # program.Graph: wierzchołki 0..n-1
+    elif hasattr(graph, "adj"):
+        g = CompactGraph.from_adjacency(graph.adj, graph.n, base=0)
+    else:
+        raise TypeError(f"Nieobsługiwany typ grafu: {type(graph).__name__}")
+    if version is not None:
+        graph._frozen = (version, g)
+    return g
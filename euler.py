@@ -0,0 +1,58 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, TextIO
+
+import compact_graph
+
+
+def iter_euler_cycle(graph) -> Iterator[int]:
+    # Hierholzer na pozycjach CSR: kursor na wiersz, bitmapa użytych pozycji i stos
+    # w tablicy array zamiast kopii zbiorów. Wierzchołki wychodzą w kolejności
+    # zdejmowania ze stosu, czyli jako odwrócony cykl Eulera - też poprawny cykl.
+    g = compact_graph.freeze(graph)
+    targets, offsets, base = g.targets, g.offsets, g.base
+    start = next((v for v in g.vertices() if g.vertex_degree(v)), g.base if g.n else None)
+    if start is None:
+        return
+    cursor = array('q', offsets[:-1])
+    used = bytearray(len(targets))
+    stack = array('i', [start])
+    while stack:
+        u = stack[-1]
+        i = u - base
+        c, end = cursor[i], offsets[i + 1]
+        while c < end and used[c]:
+            c += 1
+        cursor[i] = c
+        if c < end:
+            v = targets[c]
+            used[c] = 1
+            j = v - base
+            used[bisect_left(targets, u, offsets[j], offsets[j + 1])] = 1
+            stack.append(v)
+        else:
+            yield stack.pop()
+
+
+def write_cycle(vertices: Iterable[int], stream: TextIO, separator: str = " -> ", chunk_size: int = 4096) -> int:
+    written = 0
+    chunk = []
+    for v in vertices:
+        chunk.append(str(v))
+        if len(chunk) == chunk_size:
+            if written:
+                stream.write(separator)
+            stream.write(separator.join(chunk))
+            written += len(chunk)
+            chunk.clear()
+    if chunk:
+        if written:
+            stream.write(separator)
+        stream.write(separator.join(chunk))
+        written += len(chunk)
+    stream.write("\n")
+    return written
+
+
+def write_euler_cycle(graph, stream: TextIO, separator: str = " -> ", chunk_size: int = 4096) -> int:
+    return write_cycle(iter_euler_cycle(graph), stream, separator, chunk_size)
@@ -1,54 +1,114 @@
 import random
-import math
-from typing import List
-from collections import deque
+import sys
+import euler
+import hamilton
+import instrumentation
+import tikz
+from union_find import DisjointSet
+from compact_graph import CompactGraph, freeze
 
 class Graph:
     def __init__(self, vertices_count):
         self.n = vertices_count
         self.adjacency = {v: set() for v in range(1, vertices_count + 1)}
+        # Zasiany cykl Hamiltona - certyfikat; naprawy parzystości i spójności nie
+        # usuwają jego krawędzi, a każde usunięcie krawędzi cyklu go unieważnia.
         self.hamiltonian_cycle = []
+        self._cycle_edges = set()
+        # Zwiększany przy każdej zmianie krawędzi; unieważnia zapamiętane wyniki.
+        self.version = 0
+        self._frozen = None
+        # Stopnie (indeks 0 nieużywany), wierzchołki o nieparzystym stopniu i liczba
+        # krawędzi aktualizowane przy każdej zmianie zamiast liczenia od nowa.
+        self.degree = [0] * (vertices_count + 1)
+        self.odd = set()
+        self.m = 0
+        self.isolated = vertices_count
+        # Składowe spójności uzupełniane przy dodawaniu krawędzi; usunięcie krawędzi
+        # unieważnia strukturę, odbudowywaną dopiero przy następnym zapytaniu.
+        self._components = DisjointSet(vertices_count, base=1)
+
+    def _change_degree(self, v, delta):
+        if self.degree[v] == 0:
+            self.isolated -= 1
+        self.degree[v] += delta
+        if self.degree[v] == 0:
+            self.isolated += 1
+        if v in self.odd:
+            self.odd.remove(v)
+        else:
+            self.odd.add(v)
 
     def add_edge(self, u, v):
+        if v in self.adjacency[u]:
+            return
         self.adjacency[u].add(v)
         self.adjacency[v].add(u)
+        self._change_degree(u, 1)
+        self._change_degree(v, 1)
+        self.m += 1
+        self.version += 1
+        if self._components is not None:
+            self._components.union(u, v)
 
     def remove_edge(self, u, v):
-        self.adjacency[u].discard(v)
-        self.adjacency[v].discard(u)
+        if v not in self.adjacency[u]:
+            return
+        self.adjacency[u].remove(v)
+        self.adjacency[v].remove(u)
+        self._change_degree(u, -1)
+        self._change_degree(v, -1)
+        self.m -= 1
+        self.version += 1
+        self._components = None
+        if self.is_cycle_edge(u, v):
+            self.hamiltonian_cycle = []
+            self._cycle_edges = set()
 
     def has_edge(self, u, v):
         return v in self.adjacency[u]
 
+    def is_cycle_edge(self, u, v):
+        return (min(u, v), max(u, v)) in self._cycle_edges
+
     def vertex_degree(self, v):
-        return len(self.adjacency[v])
+        return self.degree[v]
 
-    def is_eulerian(self):
-        return all(self.vertex_degree(v) % 2 == 0 for v in self.adjacency)
+    def edge_count(self):
+        return self.m
+
+    def components(self):
+        if self._components is None:
+            self._components = DisjointSet.from_edges(
+                self.n, ((u, v) for u in self.adjacency for v in self.adjacency[u] if u < v), base=1)
+        return self._components
 
     def is_connected(self):
-        visited = set()
-        queue = deque([1])
-        while queue:
-            u = queue.popleft()
-            if u not in visited:
-                visited.add(u)
-                queue.extend(self.adjacency[u] - visited)
-        return len(visited) == self.n
+        return self.components().count <= 1
+
+    def edges_connected(self):
+        # Wszystkie krawędzie w jednej składowej (wierzchołki izolowane pomijane).
+        return self.components().count - self.isolated <= 1
+
+    def is_eulerian(self):
+        return not self.odd and self.edges_connected()
 
     def generate_hamiltonian_cycle(self):
         vertices = list(range(1, self.n + 1))
         random.shuffle(vertices)
-        self.hamiltonian_cycle = vertices + [vertices[0]]
         for i in range(self.n):
             self.add_edge(vertices[i], vertices[(i + 1) % self.n])
+        self.hamiltonian_cycle = vertices + [vertices[0]]
+        self._cycle_edges = {(min(u, v), max(u, v)) for u, v in zip(vertices, self.hamiltonian_cycle[1:])}
+        self.version += 1
 
     def add_edges_with_triangles(self, target_saturation):
         max_edges = self.n * (self.n - 1) // 2
-        current_edges = sum(len(adj) for adj in self.adjacency.values()) // 2
+        current_edges = self.m
         target_edges = int(target_saturation * max_edges)
 
         attempts = 0
+        rejected = 0
         max_attempts = self.n * 100  # Avoid infinite loop in dense graphs
 
         while current_edges < target_edges and attempts < max_attempts:
@@ -66,180 +126,132 @@ class Graph:
                 self.add_edge(c, a)
                 added += 1
 
+            if not added:
+                rejected += 1
             current_edges += added
             attempts += 1
 
+        if instrumentation.enabled:
+            instrumentation.count("trojkaty.proby", attempts)
+            instrumentation.count("trojkaty.odrzucone", rejected)
+
     def parzyste_stopnie(self):
-        while True:
-            odd_vertices = [v for v in self.adjacency if self.vertex_degree(v) % 2 != 0]
-            if not odd_vertices:
-                break
-            if len(odd_vertices) % 2 != 0:
-                raise RuntimeError("Nie można uzyskać parzystych stopni")
-            u, v = random.sample(odd_vertices, 2)
-            if self.has_edge(u, v):
-                self.remove_edge(u, v)
+        # Nieparzystych wierzchołków jest zawsze parzyście wiele; łączymy je w losowe
+        # pary i przełączamy krawędź każdej pary - jedno przejście, O(liczba par).
+        # Krawędź cyklu zostaje - wtedy parzystość naprawia ścieżka u - w - v.
+        odd_vertices = list(self.odd)
+        random.shuffle(odd_vertices)
+        for i in range(0, len(odd_vertices), 2):
+            u, v = odd_vertices[i], odd_vertices[i + 1]
+            if not self.is_cycle_edge(u, v):
+                self._toggle(u, v)
+                continue
+            for _ in range(100 * self.n):
+                w = random.randint(1, self.n)
+                if w != u and w != v and not self.is_cycle_edge(u, w) and not self.is_cycle_edge(w, v):
+                    self._toggle(u, w)
+                    self._toggle(w, v)
+                    break
             else:
-                self.add_edge(u, v)
+                raise RuntimeError("Nie można uzyskać parzystych stopni")
+        if instrumentation.enabled:
+            instrumentation.count("parzyste_stopnie.pary", len(odd_vertices) // 2)
+
+    def _toggle(self, u, v):
+        if self.has_edge(u, v):
+            self.remove_edge(u, v)
+        else:
+            self.add_edge(u, v)
 
     def zapewnienie_spojnosci(self):
         if self.is_connected():
             return
 
-        components = []
-        visited = set()
+        # Jedno przejście: wierzchołki grupowane po korzeniu, kolejne składowe
+        # łączone krawędzią między losowymi wierzchołkami.
+        dsu = self.components()
+        members = {}
         for v in range(1, self.n + 1):
-            if v not in visited:
-                component = set()
-                queue = deque([v])
-                while queue:
-                    u = queue.popleft()
-                    if u not in visited:
-                        visited.add(u)
-                        component.add(u)
-                        queue.extend(self.adjacency[u] - visited)
-                components.append(component)
-
-        for i in range(len(components) - 1):
-            u = random.choice(list(components[i]))
-            v = random.choice(list(components[i + 1]))
-            self.add_edge(u, v)
+            members.setdefault(dsu.find(v), []).append(v)
+        components = list(members.values())
+        if instrumentation.enabled:
+            instrumentation.count("spojnosc.skladowe", len(components))
+
+        for a, b in zip(components, components[1:]):
+            self.add_edge(random.choice(a), random.choice(b))
 
         self.parzyste_stopnie()
 
     def non_hamilton(self):
-        vertex = random.choice(self.hamiltonian_cycle)
-        neighbors = list(self.adjacency[vertex])
-        for neighbor in neighbors:
-            self.adjacency[vertex].remove(neighbor)
-            self.adjacency[neighbor].remove(vertex)
+        vertex = random.choice(self.hamiltonian_cycle or list(self.adjacency))
+        for neighbor in list(self.adjacency[vertex]):
+            self.remove_edge(vertex, neighbor)
         assert len(self.adjacency[vertex]) == 0
+        assert not self.hamiltonian_cycle
 
-    def get_adjacency_matrix(self):
-        matrix = [[0] * (self.n + 1) for _ in range(self.n + 1)]
-        for u in self.adjacency:
-            for v in self.adjacency[u]:
-                matrix[u][v] = 1
-        col_width = len(str(self.n)) + 1
-        print(" " * col_width, end=" |")
-        for i in range(1, self.n + 1):
-            print(f"{i:>{col_width}}", end="")
-        print()
-        print("-" * (col_width + 1) + "+" + "-" * (self.n * col_width))
-        for i in range(1, self.n + 1):
-            print(f"{i:>{col_width}} |", end="")
-            for j in range(1, self.n + 1):
-                print(f"{matrix[i][j]:>{col_width}}", end="")
-            print()
-
-    def get_incidence_matrix(self):
-        edges = [(u, v) for u in range(1, self.n + 1)
-                 for v in self.adjacency[u] if u < v]
-        matrix = [[0] * len(edges) for _ in range(self.n + 1)]
-        for edge_idx, (u, v) in enumerate(edges):
-            matrix[u][edge_idx] = 1
-            matrix[v][edge_idx] = 1
-        vertex_col_width = len(str(self.n)) + 1
-        edge_col_width = 3  # Enough space for 0/1 values
-        print(" " * vertex_col_width, end=" |")
-        for edge_idx in range(len(edges)):
-            print(f"e{edge_idx + 1:>{edge_col_width - 1}}", end=" ")
-        print()
-        print("-" * vertex_col_width + "+" + "-" * (len(edges) * (edge_col_width + 1)))
-        for vertex in range(1, self.n + 1):
-            print(f"{vertex:>{vertex_col_width}} |", end="")
-            for edge_idx in range(len(edges)):
-                print(f"{matrix[vertex][edge_idx]:>{edge_col_width}}", end=" ")
-            print()
+    # Reprezentacje pochodne idą przez zamrożoną kopię, budowaną raz na wersję grafu.
+    def get_adjacency_matrix(self, stream=None):
+        self.freeze().get_adjacency_matrix(stream)
+
+    def get_incidence_matrix(self, stream=None, fmt="dense"):
+        self.freeze().get_incidence_matrix(stream, fmt)
+
+    def freeze(self) -> CompactGraph:
+        return freeze(self)
 
     def get_edge_list(self):
-        return sorted({(min(u, v), max(u, v)) for u in self.adjacency for v in self.adjacency[u]})
+        return self.freeze().get_edge_list()
 
     def get_adjacency_list(self):
-        return {v: sorted(neighbors) for v, neighbors in self.adjacency.items()}
+        return self.freeze().get_adjacency_list()
 
-    def find_euler_cycle(self):
-        if not self.is_eulerian():
+    def find_euler_cycle(self, stream=None, cache=None):
+        # cache: solver_cache.SolverCache - ponowne wywołanie dla niezmienionego grafu
+        # wypisuje zapamiętany cykl zamiast liczyć go od nowa.
+        if cache is not None:
+            cycle = cache.euler_cycle(self)
+        elif self.is_eulerian():
+            cycle = euler.iter_euler_cycle(self)
+        else:
+            cycle = None
+        if cycle is None:
             print("Graf nie ma cyklu Eulera!")
             return
-        graph_copy = {u: set(v) for u, v in self.adjacency.items()}
-        stack = [1]
-        path = []
-        while stack:
-            current = stack[-1]
-            if graph_copy[current]:
-                neighbor = graph_copy[current].pop()
-                graph_copy[neighbor].remove(current)
-                stack.append(neighbor)
-            else:
-                path.append(stack.pop())
         print("Cykl Eulera:")
-        print(" -> ".join(map(str, path[::-1])))
-    def find_hamilton_cycle(self):
-        def backtrack(current: int, visited: dict, path: List[int]) -> bool:
-            if len(path) == self.n:
-                return path[0] in self.adjacency[path[-1]]
-            for neighbor in self.adjacency[current]:
-                if not visited[neighbor]:
-                    visited[neighbor] = True
-                    path.append(neighbor)
-                    if backtrack(neighbor, visited, path):
-                        return True
-                    visited[neighbor] = False
-                    path.pop()
-            return False
-        for start in range(1, self.n + 1):
-            visited = {v: False for v in range(1, self.n + 1)}
-            path = [start]
-            visited[start] = True
-            if backtrack(start, visited, path):
-                path.append(path[0])
-                print("Cykl Hamiltona:")
-                print(" -> ".join(map(str, path)))
-                return
-        print("Nie znaleziono cyklu Hamiltona.")
-
-    def export_to_tikz(self, filename=None):
-        tikz = """\\documentclass{standalone}
-    \\usepackage{tikz}
-    \\begin{document}
-    \\begin{tikzpicture}[every node/.style={draw, circle, thick, minimum size=7mm}]
-    """
-        angle_step = 360 / self.n
-        positions = {}
-        for i, node in enumerate(range(1, self.n + 1)):
-            angle = i * angle_step
-            x = 5 * math.cos(math.radians(angle))
-            y = 5 * math.sin(math.radians(angle))
-            positions[node] = (x, y)
-        for node, (x, y) in positions.items():
-            tikz += f"  \\node ({node}) at ({x:.2f},{y:.2f}) {{{node}}};\n"
-        drawn = set()
-        for u in self.adjacency:
-            for v in self.adjacency[u]:
-                if (u, v) not in drawn and (v, u) not in drawn:
-                    tikz += f"  \\draw[thick] ({u}) -- ({v});\n"
-                    drawn.add((u, v))
-        tikz += """\\end{tikzpicture}
-    \\end{document}
-    """
+        euler.write_cycle(cycle, stream or sys.stdout)
+
+    def find_hamilton_cycle(self, method="auto", time_limit=None, progress=None, cache=None):
+        if cache is not None:
+            result = cache.hamilton(self, method, time_limit=time_limit, progress=progress)
+        else:
+            result = hamilton.search(self, method, time_limit=time_limit, progress=progress)
+        if result.status == hamilton.FOUND:
+            print("Cykl Hamiltona:")
+            print(" -> ".join(map(str, result.cycle)))
+        elif result.status == hamilton.UNKNOWN:
+            print(f"Nie rozstrzygnięto w limicie ({result.stats}).")
+        else:
+            print("Nie znaleziono cyklu Hamiltona.")
+        return result
+
+    def export_to_tikz(self, filename=None, max_edges=None, layout="circle"):
         if filename:
-            with open(filename, 'w') as f:
-                f.write(tikz)
-        print(tikz)
+            tikz.export_tikz(self, filename, max_edges, layout)
+        else:
+            tikz.write_tikz(self, sys.stdout, max_edges, layout)
 
 def generowanie(vertices, saturation, mode):
     graph = Graph(vertices)
-    if mode == "hamil":
-        graph.generate_hamiltonian_cycle()
-        graph.add_edges_with_triangles(saturation)
-        graph.parzyste_stopnie()
-        graph.zapewnienie_spojnosci()
-    elif mode == "non-hamil":
-        graph.generate_hamiltonian_cycle()
-        graph.add_edges_with_triangles(saturation)
-        graph.parzyste_stopnie()
-        graph.zapewnienie_spojnosci()
+    if mode in ("hamil", "non-hamil"):
+        with instrumentation.stage("generowanie.cykl"):
+            graph.generate_hamiltonian_cycle()
+        with instrumentation.stage("generowanie.trojkaty"):
+            graph.add_edges_with_triangles(saturation)
+        with instrumentation.stage("generowanie.parzystosc"):
+            graph.parzyste_stopnie()
+        with instrumentation.stage("generowanie.spojnosc"):
+            graph.zapewnienie_spojnosci()
+    if mode == "non-hamil":
         graph.non_hamilton()
 
     return graph
@@ -0,0 +1,238 @@
+import random
+import sys
+from array import array
+from itertools import compress
+from typing import List, Optional
+
+from compact_graph import CompactGraph
+
+# Generator wsadowy: graf trzymany jako trójkąt górny spakowany po bicie na parę
+# (u, v), u < v, pod indeksem u * (2n - u - 1) / 2 + v - u - 1, więc wiersz u to
+# ciągły przedział bitów. Wiersze losowane są w całości, a pary odbijane dopiero
+# przy budowie CSR. Przy n = 10^4 bitmapa zajmuje ~6 MB, przy n = 10^5 ~625 MB.
+
+_DO_ASCII = bytes(48 + (b & 1) for b in range(256))
+_Z_ASCII = bytes(1 if b == 49 else 0 for b in range(256))
+
+
+def _tablica_bernoulliego(p: float) -> bytes:
+    # Tablica dla bytes.translate: losowy bajt -> 1 z prawdopodobieństwem ~p.
+    prog = min(256, max(0, round(p * 256)))
+    return bytes(1 if b < prog else 0 for b in range(256))
+
+
+class _Bitmapa:
+    def __init__(self, n: int, rng: random.Random):
+        self.n = n
+        self.rng = rng
+        self.bity = bytearray((n * (n - 1) // 2 + 7) // 8 + 1)
+        self.stopnie = array('i', [0]) * n
+        self.cykl = set()
+        self.pary_cyklu = []
+        self.krawedzie = 0
+
+    def klucz(self, u: int, v: int) -> int:
+        if u > v:
+            u, v = v, u
+        return u * (2 * self.n - u - 1) // 2 + v - u - 1
+
+    def jest(self, u: int, v: int) -> bool:
+        k = self.klucz(u, v)
+        return self.bity[k >> 3] >> (k & 7) & 1 == 1
+
+    def przelacz(self, u: int, v: int) -> int:
+        k = self.klucz(u, v)
+        self.bity[k >> 3] ^= 1 << (k & 7)
+        zmiana = 1 if self.bity[k >> 3] >> (k & 7) & 1 else -1
+        self.stopnie[u] += zmiana
+        self.stopnie[v] += zmiana
+        self.krawedzie += zmiana
+        return zmiana
+
+    def stopien(self, v: int) -> int:
+        return self.stopnie[v]
+
+    def wiersz(self, u: int) -> int:
+        # Bity par (u, u + 1..n - 1) jako liczba: bit j to wierzchołek u + 1 + j.
+        dlugosc = self.n - u - 1
+        if dlugosc <= 0:
+            return 0
+        poczatek = self.klucz(u, u + 1)
+        bajty = self.bity[poczatek >> 3:(poczatek + dlugosc + 7 >> 3) + 1]
+        return int.from_bytes(bajty, "little") >> (poczatek & 7) & ((1 << dlugosc) - 1)
+
+    def zasiej_cykl(self, kolejnosc: List[int]):
+        # Bity cyklu ustawia wypelnij() po losowaniu wierszy.
+        for i in range(len(kolejnosc)):
+            u, v = kolejnosc[i], kolejnosc[(i + 1) % len(kolejnosc)]
+            self.pary_cyklu.append((u, v))
+            self.cykl.add(self.klucz(u, v))
+
+    def wypelnij(self, p: float, aktywne: List[int]):
+        n = self.n
+        tablica = _tablica_bernoulliego(p)
+        aktywne_maska = bytearray(n)
+        for v in aktywne:
+            aktywne_maska[v] = 1
+        # Stopnie od strony kolumn: wiersze dodawane jako liczby o bajtowych polach
+        # (co 255 wierszy przelewane do pól 32-bitowych, żeby pola się nie przepełniły).
+        kolumny = 0
+        blok = 0
+        w_bloku = 0
+        for i in aktywne:
+            if i >= n - 1:
+                continue
+            dlugosc = n - i - 1
+            wiersz = self.rng.randbytes(dlugosc).translate(tablica)
+            # Kolumny nieaktywnych wierzchołków (izolowany) zerowane jednym AND.
+            wiersz = (int.from_bytes(wiersz, "little")
+                      & int.from_bytes(aktywne_maska[i + 1:], "little")).to_bytes(dlugosc, "little")
+            self.stopnie[i] += wiersz.count(1)
+            blok += int.from_bytes(wiersz, "little") << (8 * (i + 1))
+            w_bloku += 1
+            if w_bloku == 255:
+                kolumny += self._pola_32(blok)
+                blok = w_bloku = 0
+            # Wiersz 0/1 na bajt -> bity, dopisane OR-em od pozycji klucz(i, i + 1).
+            bity = int(wiersz.translate(_DO_ASCII)[::-1], 2)
+            poczatek = self.klucz(i, i + 1)
+            a, b = poczatek >> 3, (poczatek + dlugosc + 7 >> 3) + 1
+            obecne = int.from_bytes(self.bity[a:b], "little") | bity << (poczatek & 7)
+            self.bity[a:b] = obecne.to_bytes(b - a, "little")
+        kolumny += self._pola_32(blok)
+        z_kolumn = array('i')
+        z_kolumn.frombytes(kolumny.to_bytes(4 * n, "little"))
+        if sys.byteorder != "little":
+            z_kolumn.byteswap()
+        for v in range(n):
+            self.stopnie[v] += z_kolumn[v]
+        self.krawedzie = sum(self.stopnie) // 2
+        for u, v in self.pary_cyklu:
+            if not self.jest(u, v):
+                self.przelacz(u, v)
+
+    def _pola_32(self, blok: int) -> int:
+        pola = bytearray(4 * self.n)
+        pola[0::4] = blok.to_bytes(self.n, "little")
+        return int.from_bytes(pola, "little")
+
+    def dopasuj_liczbe(self, cel: int, aktywne: List[int]):
+        while self.krawedzie < cel:
+            u, v = self.rng.sample(aktywne, 2)
+            if not self.jest(u, v):
+                self.przelacz(u, v)
+        while self.krawedzie > cel:
+            u, v = self.rng.sample(aktywne, 2)
+            if self.jest(u, v) and self.klucz(u, v) not in self.cykl:
+                self.przelacz(u, v)
+
+    def parzyste_stopnie(self, aktywne: List[int]):
+        nieparzyste = [v for v in aktywne if self.stopien(v) % 2]
+        self.rng.shuffle(nieparzyste)
+        for i in range(0, len(nieparzyste), 2):
+            u, v = nieparzyste[i], nieparzyste[i + 1]
+            if self.klucz(u, v) not in self.cykl:
+                self.przelacz(u, v)
+                continue
+            # Krawędź cyklu zostaje - parzystość naprawiana ścieżką u - w - v.
+            for _ in range(100 * len(aktywne)):
+                w = self.rng.choice(aktywne)
+                if w != u and w != v and self.klucz(u, w) not in self.cykl \
+                        and self.klucz(w, v) not in self.cykl:
+                    self.przelacz(u, w)
+                    self.przelacz(w, v)
+                    break
+            else:
+                raise RuntimeError("Nie można uzyskać parzystych stopni")
+
+    def wyrownaj_trojkatami(self, cel: int, aktywne: List[int]):
+        # Przełączenie trójkąta nie zmienia parzystości żadnego wierzchołka,
+        # a zmienia liczbę krawędzi o 3 - 2 * (liczba istniejących boków).
+        proby = 0
+        limit = 1000 * (abs(cel - self.krawedzie) + len(aktywne))
+        while self.krawedzie != cel:
+            proby += 1
+            if proby > limit:
+                raise RuntimeError("Nie można uzyskać parzystych stopni przy zadanym nasyceniu")
+            a, b, c = self.rng.sample(aktywne, 3)
+            boki = ((a, b), (b, c), (c, a))
+            obecne = [bok for bok in boki if self.jest(*bok)]
+            if any(self.klucz(*bok) in self.cykl for bok in obecne):
+                continue
+            zmiana = 3 - 2 * len(obecne)
+            brak = cel - self.krawedzie
+            if zmiana * brak <= 0 or abs(zmiana) > abs(brak):
+                continue
+            for bok in boki:
+                self.przelacz(*bok)
+
+    def spojna(self, aktywne: List[int]) -> bool:
+        # Wiersze trzymają tylko sąsiadów o większych numerach, więc odwiedzone
+        # rozszerzane są naprzemiennymi przebiegami w przód i wstecz aż do punktu stałego.
+        n = self.n
+        odwiedzone = 1 << aktywne[0]
+        zmiana = True
+        while zmiana:
+            zmiana = False
+            for kolejnosc in (range(n), range(n - 1, -1, -1)):
+                for u in kolejnosc:
+                    sasiedzi = self.wiersz(u) << (u + 1)
+                    if odwiedzone >> u & 1:
+                        nowe = sasiedzi & ~odwiedzone
+                        if nowe:
+                            odwiedzone |= nowe
+                            zmiana = True
+                    elif sasiedzi & odwiedzone:
+                        odwiedzone |= (1 << u) | sasiedzi
+                        zmiana = True
+        return odwiedzone.bit_count() == len(aktywne)
+
+    def do_csr(self, hamiltonian_cycle: Optional[List[int]] = None) -> CompactGraph:
+        # Para (u, v) odbijana dopiero tutaj: mniejsi sąsiedzi v zbierani są przy
+        # wierszach u < v, więc każdy wiersz CSR wychodzi posortowany.
+        n = self.n
+        offsets = array('q', [0])
+        targets = array('i')
+        mniejsi = [array('i') for _ in range(n)]
+        for i in range(n):
+            dlugosc = n - i - 1
+            targets.extend(mniejsi[i])
+            mniejsi[i] = None
+            if dlugosc > 0:
+                bajty = format(self.wiersz(i), "0%db" % dlugosc)[::-1].encode().translate(_Z_ASCII)
+                wieksi = array('i', compress(range(i + 2, n + 2), bajty))
+                targets.extend(wieksi)
+                etykieta = i + 1
+                for v in wieksi:
+                    mniejsi[v - 1].append(etykieta)
+            offsets.append(len(targets))
+        return CompactGraph(n, offsets, targets, base=1, hamiltonian_cycle=hamiltonian_cycle)
+
+
+def generowanie_wsadowe(vertices: int, saturation: float, mode: str,
+                        seed: Optional[int] = None) -> CompactGraph:
+    if mode not in ("hamil", "non-hamil"):
+        raise ValueError(f"Nieznany tryb: {mode}")
+    rng = random.Random(seed)
+    n = vertices
+    izolowany = rng.randrange(n) if mode == "non-hamil" else None
+    aktywne = [v for v in range(n) if v != izolowany]
+    max_krawedzi = len(aktywne) * (len(aktywne) - 1) // 2
+    cel = int(saturation * (n * (n - 1) // 2))
+    if len(aktywne) < 3 or not len(aktywne) <= cel <= max_krawedzi:
+        raise ValueError("Nie można osiągnąć zadanego nasycenia")
+
+    bitmapa = _Bitmapa(n, rng)
+    kolejnosc = aktywne[:]
+    rng.shuffle(kolejnosc)
+    bitmapa.zasiej_cykl(kolejnosc)
+    p = (cel - len(kolejnosc)) / max(1, max_krawedzi - len(kolejnosc))
+    bitmapa.wypelnij(p, aktywne)
+    bitmapa.dopasuj_liczbe(cel, aktywne)
+    bitmapa.parzyste_stopnie(aktywne)
+    bitmapa.wyrownaj_trojkatami(cel, aktywne)
+    if not bitmapa.spojna(aktywne):
+        raise RuntimeError("Graf niespójny mimo zasianego cyklu")
+
+    cykl = [v + 1 for v in kolejnosc] + [kolejnosc[0] + 1] if izolowany is None else []
+    return bitmapa.do_csr(cykl)
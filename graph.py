@@ -1,25 +1,77 @@
 from collections import defaultdict
 import random
 from typing import List, Dict, Set
+import instrumentation
+from compact_graph import CompactGraph, freeze
+from sampling import sample_missing_pairs
+from union_find import DisjointSet
 
 class UndirectedGraph:
     def __init__(self, num_nodes: int):
         self.num_nodes = num_nodes
         self.adjacency_list: Dict[int, Set[int]] = defaultdict(set)
+        self.num_edges = 0
+        self.version = 0
+        self._frozen = None
+        # Nodes with odd degree, updated on every edge change.
+        self.odd_nodes: Set[int] = set()
+        # Components grow with add_edge; a removal drops them until the next query.
+        self._components = DisjointSet(num_nodes)
+        # Planted Hamiltonian cycle (closed, first node repeated) kept as a certificate;
+        # parity repair never removes its edges and any removal of one drops it.
+        self.hamiltonian_cycle: List[int] = []
+        self._cycle_edges: Set[tuple] = set()
+
+    def _flip_parity(self, node: int):
+        if node in self.odd_nodes:
+            self.odd_nodes.remove(node)
+        else:
+            self.odd_nodes.add(node)
 
     def add_edge(self, node_a: int, node_b: int):
-        if node_a != node_b:
+        if node_a != node_b and node_b not in self.adjacency_list[node_a]:
             self.adjacency_list[node_a].add(node_b)
             self.adjacency_list[node_b].add(node_a)
+            self._flip_parity(node_a)
+            self._flip_parity(node_b)
+            self.num_edges += 1
+            self.version += 1
+            if self._components is not None:
+                self._components.union(node_a, node_b)
+
+    def remove_edge(self, node_a: int, node_b: int):
+        if node_b in self.adjacency_list[node_a]:
+            self.adjacency_list[node_a].remove(node_b)
+            self.adjacency_list[node_b].remove(node_a)
+            self._flip_parity(node_a)
+            self._flip_parity(node_b)
+            self.num_edges -= 1
+            self.version += 1
+            self._components = None
+            if self.is_cycle_edge(node_a, node_b):
+                self.hamiltonian_cycle = []
+                self._cycle_edges = set()
+
+    def is_cycle_edge(self, node_a: int, node_b: int) -> bool:
+        return (min(node_a, node_b), max(node_a, node_b)) in self._cycle_edges
+
+    def components(self) -> DisjointSet:
+        if self._components is None:
+            self._components = DisjointSet.from_edges(
+                self.num_nodes, ((u, v) for u, nbrs in self.adjacency_list.items() for v in nbrs if u < v))
+        return self._components
+
+    def is_connected(self) -> bool:
+        return self.components().count <= 1
 
     def edge_count(self) -> int:
-        return sum(len(neighbors) for neighbors in self.adjacency_list.values()) // 2
+        return self.num_edges
 
     def total_possible_edges(self) -> int:
         return self.num_nodes * (self.num_nodes - 1) // 2
 
     def is_all_degrees_even(self) -> bool:
-        return all(len(neighbors) % 2 == 0 for neighbors in self.adjacency_list.values())
+        return not self.odd_nodes
 
     def create_triangle(self, a: int, b: int, c: int):
         self.add_edge(a, b)
@@ -27,30 +79,81 @@ class UndirectedGraph:
         self.add_edge(c, a)
 
     def add_short_cycles_for_even_degrees(self, max_attempts: int = 1000):
+        # Triangles never change parity, so odd nodes are paired up instead. Each pair
+        # gets the edge a-b, or a path a-w-b through a random node w if a-b exists
+        # (w gains two edges and stays even). Only when no such w turns up within
+        # max_attempts tries is the edge a-b removed - or, if it is a cycle edge,
+        # the path a-w-b toggled through a w off the cycle.
+        odd = list(self.odd_nodes)
+        random.shuffle(odd)
         attempts = 0
-        while not self.is_all_degrees_even() and attempts < max_attempts:
-            a, b, c = random.sample(range(self.num_nodes), 3)
-            self.create_triangle(a, b, c)
-            attempts += 1
+        for i in range(0, len(odd), 2):
+            a, b = odd[i], odd[i + 1]
+            if b not in self.adjacency_list[a]:
+                self.add_edge(a, b)
+                continue
+            for _ in range(max_attempts):
+                attempts += 1
+                w = random.randrange(self.num_nodes)
+                if w != a and w != b and w not in self.adjacency_list[a] and w not in self.adjacency_list[b]:
+                    self.add_edge(a, w)
+                    self.add_edge(w, b)
+                    break
+            else:
+                if not self.is_cycle_edge(a, b):
+                    self.remove_edge(a, b)
+                    continue
+                for _ in range(100 * self.num_nodes):
+                    w = random.randrange(self.num_nodes)
+                    if w != a and w != b and not self.is_cycle_edge(a, w) and not self.is_cycle_edge(w, b):
+                        self._toggle(a, w)
+                        self._toggle(w, b)
+                        break
+                else:
+                    raise RuntimeError("Cannot make all degrees even without breaking the Hamiltonian cycle")
+        if instrumentation.enabled:
+            instrumentation.count("short_cycles.pairs", len(odd) // 2)
+            instrumentation.count("short_cycles.attempts", attempts)
+
+    def _toggle(self, node_a: int, node_b: int):
+        if node_b in self.adjacency_list[node_a]:
+            self.remove_edge(node_a, node_b)
+        else:
+            self.add_edge(node_a, node_b)
 
     def generate_hamiltonian_cycle(self):
         nodes = list(range(self.num_nodes))
         random.shuffle(nodes)
         for i in range(len(nodes)):
             self.add_edge(nodes[i], nodes[(i + 1) % len(nodes)])
+        self.hamiltonian_cycle = nodes + nodes[:1]
+        self._cycle_edges = {(min(u, v), max(u, v)) for u, v in zip(nodes, self.hamiltonian_cycle[1:])}
+        self.version += 1
 
-    def fill_to_saturation(self, saturation_percent: int):
+    def fill_to_saturation(self, saturation_percent: int, mode: str = "sample"):
         target_edges = int(self.total_possible_edges() * (saturation_percent / 100))
-        while self.edge_count() < target_edges:
-            u, v = random.sample(range(self.num_nodes), 2)
-            self.add_edge(u, v)
+        if instrumentation.enabled:
+            instrumentation.count("fill.edges_added", max(0, target_edges - self.num_edges))
+        if mode == "sample":
+            missing = target_edges - self.num_edges
+            for u, v in sample_missing_pairs(self.num_nodes, missing, self.adjacency_list, self.num_edges):
+                self.add_edge(u, v)
+        elif mode == "random":
+            while self.num_edges < target_edges:
+                u, v = random.sample(range(self.num_nodes), 2)
+                self.add_edge(u, v)
+        else:
+            raise ValueError(f"Unknown fill mode: {mode}")
 
     def isolate_node(self, node_index: int = 0):
         for neighbor in list(self.adjacency_list[node_index]):
-            self.adjacency_list[neighbor].remove(node_index)
-        self.adjacency_list[node_index] = set()
+            self.remove_edge(node_index, neighbor)
 
     def display_adjacency_list(self):
         print("Graph (adjacency list):")
-        for node in range(self.num_nodes):
-            print(f"{node}: {sorted(self.adjacency_list[node])}")
\ No newline at end of file
+        frozen = self.freeze()
+        for node in frozen.vertices():
+            print(f"{node}: {list(frozen.neighbors(node))}")
+
+    def freeze(self) -> CompactGraph:
+        return freeze(self)
@@ -0,0 +1,69 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+import compact_graph
+
+# Format pliku (little-endian):
+#   nagłówek: magic, wersja, base, n, liczba pozycji targets, długość metadanych
+#   offsets:  (n + 1) x int64
+#   targets:  liczba pozycji x int32, dopełnione zerami do wielokrotności 8 bajtów
+#   metadane: JSON w UTF-8 (hamiltonian_cycle, seed, saturation, ...)
+MAGIC = b"AISDGRF\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIiqqq")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def save_graph(graph, filename: str, **metadata) -> int:
+    g = compact_graph.freeze(graph)
+    meta = dict(g.metadata)
+    meta.update(metadata)
+    if g.hamiltonian_cycle:
+        meta["hamiltonian_cycle"] = list(g.hamiltonian_cycle)
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    offsets = _little_endian(array('q', g.offsets))
+    targets = _little_endian(array('i', g.targets))
+    padding = -len(targets) % 8
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, g.base, g.n, len(g.targets), len(meta_bytes)))
+        f.write(offsets)
+        f.write(targets)
+        f.write(b"\0" * padding)
+        f.write(meta_bytes)
+        return f.tell()
+
+
+def load_graph(filename: str) -> "compact_graph.CompactGraph":
+    # Plik mapowany w pamięć; offsets i targets to widoki memoryview na mapowanie,
+    # więc wczytanie nie kopiuje tablic (poza maszynami big-endian).
+    with open(filename, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    magic, version, base, n, targets_len, meta_len = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"{filename}: to nie jest plik grafu")
+    if version != VERSION:
+        raise ValueError(f"{filename}: nieobsługiwana wersja formatu {version}")
+    start = HEADER.size
+    offsets = view[start:start + 8 * (n + 1)].cast('q')
+    start += 8 * (n + 1)
+    targets = view[start:start + 4 * targets_len].cast('i')
+    start += 4 * targets_len + (-4 * targets_len % 8)
+    meta = json.loads(bytes(view[start:start + meta_len]).decode("utf-8")) if meta_len else {}
+    if sys.byteorder != "little":
+        offsets, targets = array('q', offsets), array('i', targets)
+        offsets.byteswap()
+        targets.byteswap()
+    g = compact_graph.CompactGraph(n, offsets, targets, base, meta.pop("hamiltonian_cycle", None))
+    g.metadata = meta
+    g.mapping = mapping
+    return g
@@ -0,0 +1,170 @@
+import os
+import re
+from array import array
+from itertools import compress
+from operator import ne
+from typing import Iterator, Optional
+
+import compact_graph
+
+# Wczytywanie grafów z zewnątrz: lista krawędzi ("u v"), DIMACS ("p edge n m",
+# "e u v") i TSPLIB HCP (EDGE_DATA_SECTION). Plik czytany blokami zakończonymi
+# na granicy linii; blok bez komentarzy dzielony jest w całości przez bytes.split().
+CHUNK_SIZE = 1 << 22
+
+FORMATS = ("edges", "dimacs", "hcp")
+
+# Blok, w którym każda linia ma dokładnie dwie kolumny.
+_PLAIN_EDGES = re.compile(rb"(?:[ \t]*\S+[ \t]+\S+[ \t\r]*\n)*")
+
+
+def _chunks(f, chunk_size: int) -> Iterator[bytes]:
+    rest = b""
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            if rest:
+                yield rest + b"\n"
+            return
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            rest = block
+            continue
+        rest = block[cut:]
+        yield block[:cut]
+
+
+class _EdgeBuffer:
+    def __init__(self):
+        self.us = array('i')
+        self.vs = array('i')
+        self.n: Optional[int] = None
+        self.self_loops = 0
+
+    def add(self, us_tokens, vs_tokens):
+        if len(us_tokens) != len(vs_tokens):
+            raise ValueError("Nieparzysta liczba końców krawędzi")
+        us = array('i', map(int, us_tokens))
+        vs = array('i', map(int, vs_tokens))
+        keep = list(map(ne, us, vs))
+        loops = len(keep) - sum(keep)
+        if loops:
+            self.self_loops += loops
+            us = array('i', compress(us, keep))
+            vs = array('i', compress(vs, keep))
+        self.us.extend(us)
+        self.vs.extend(vs)
+
+
+def _read_edges(chunks: Iterator[bytes], buffer: _EdgeBuffer):
+    for chunk in chunks:
+        if b"#" not in chunk and b"%" not in chunk and _PLAIN_EDGES.fullmatch(chunk):
+            tokens = chunk.split()
+            buffer.add(tokens[0::2], tokens[1::2])
+            continue
+        # Komentarze, puste linie albo dodatkowe kolumny (wagi): linia po linii.
+        tokens = []
+        for line in chunk.splitlines():
+            parts = line.split(b"#", 1)[0].split(b"%", 1)[0].split()
+            if len(parts) == 1:
+                raise ValueError(f"Niepoprawna linia listy krawędzi: {line.decode(errors='replace').strip()}")
+            tokens.extend(parts[:2])
+        buffer.add(tokens[0::2], tokens[1::2])
+
+
+def _read_dimacs(chunks: Iterator[bytes], buffer: _EdgeBuffer):
+    for chunk in chunks:
+        tokens = chunk.split()
+        if len(tokens) % 3 == 0 and tokens[0::3].count(b"e") * 3 == len(tokens):
+            buffer.add(tokens[1::3], tokens[2::3])
+            continue
+        us, vs = [], []
+        for line in chunk.splitlines():
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == b"e":
+                us.append(parts[1])
+                vs.append(parts[2])
+            elif parts[0] == b"p":
+                buffer.n = int(parts[2])
+        buffer.add(us, vs)
+
+
+def _read_hcp(chunks: Iterator[bytes], buffer: _EdgeBuffer):
+    in_header = True
+    for chunk in chunks:
+        if in_header:
+            lines = chunk.splitlines(keepends=True)
+            for index, line in enumerate(lines):
+                key, _, value = line.decode("ascii", "replace").partition(":")
+                key = key.strip().upper()
+                if key == "DIMENSION":
+                    buffer.n = int(value)
+                elif key == "EDGE_DATA_FORMAT" and value.strip().upper() != "EDGE_LIST":
+                    raise ValueError(f"Nieobsługiwany EDGE_DATA_FORMAT: {value.strip()}")
+                elif key == "EDGE_DATA_SECTION":
+                    in_header = False
+                    chunk = b"".join(lines[index + 1:])
+                    break
+                elif key == "EOF":
+                    return
+            if in_header:
+                continue
+        tokens = chunk.split()
+        for end_marker in (b"-1", b"EOF"):
+            if end_marker in tokens:
+                tokens = tokens[:tokens.index(end_marker)]
+                buffer.add(tokens[0::2], tokens[1::2])
+                return
+        buffer.add(tokens[0::2], tokens[1::2])
+
+
+_READERS = {"edges": _read_edges, "dimacs": _read_dimacs, "hcp": _read_hcp}
+
+
+def detect_format(filename: str) -> str:
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in (".hcp", ".tsp"):
+        return "hcp"
+    if extension in (".col", ".dimacs", ".clq"):
+        return "dimacs"
+    with open(filename, "rb") as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped[:2] in (b"c ", b"p ") or stripped in (b"c", b"p"):
+                return "dimacs"
+            if b":" in stripped:
+                return "hcp"
+            return "edges"
+    return "edges"
+
+
+def import_graph(filename: str, fmt: Optional[str] = None,
+                 chunk_size: int = CHUNK_SIZE) -> "compact_graph.CompactGraph":
+    fmt = fmt or detect_format(filename)
+    if fmt not in _READERS:
+        raise ValueError(f"Nieznany format: {fmt}")
+    buffer = _EdgeBuffer()
+    with open(filename, "rb") as f:
+        _READERS[fmt](_chunks(f, chunk_size), buffer)
+
+    us, vs = buffer.us, buffer.vs
+    if fmt == "edges":
+        # Etykiety wierzchołków zaczynają się od najmniejszej występującej w pliku.
+        base = min(min(us), min(vs)) if us else 0
+        n = max(max(us), max(vs)) - base + 1 if us else 0
+    else:
+        base = 1
+        n = buffer.n if buffer.n is not None else (max(max(us), max(vs)) if us else 0)
+    if us and (min(min(us), min(vs)) < base or max(max(us), max(vs)) >= base + n):
+        raise ValueError(f"{filename}: etykieta wierzchołka poza zakresem {base}..{base + n - 1}")
+
+    g = compact_graph.CompactGraph.from_edge_arrays(us, vs, n, base)
+    g.metadata = {"source": os.path.basename(filename), "format": fmt,
+                  "self_loops": buffer.self_loops,
+                  "duplicates": len(us) - g.edge_count()}
+    return g
@@ -0,0 +1,899 @@
+import multiprocessing
+import os
+import random
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterator, List, Optional
+
+import compact_graph
+import instrumentation
+
+# Held-Karp trzyma 2^(n-1) masek końców ścieżek po 8 bajtów (1 GiB przy n = 28),
+# więc dla większych grafów nie mieści się w pamięci; automatycznie wybierany
+# jest dla małych grafów.
+HELD_KARP_MAX_N = 28
+HELD_KARP_AUTO_MAX_N = 16
+
+FOUND = "found"
+ABSENT = "absent"
+UNKNOWN = "unknown"
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.elapsed = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {"nodes": self.nodes, "depth": self.depth, "max_depth": self.max_depth,
+                "elapsed": self.elapsed, "rate": self.rate}
+
+    def __str__(self):
+        return (f"węzły: {self.nodes}, głębokość: {self.depth}/{self.max_depth}, "
+                f"czas: {self.elapsed:.2f}s, tempo: {self.rate:.0f}/s")
+
+
+class HamiltonResult:
+    def __init__(self, status: str, cycle: Optional[List[int]] = None,
+                 stats: Optional[SearchStats] = None, reason: Optional[str] = None):
+        self.status = status
+        self.cycle = cycle
+        self.stats = stats or SearchStats()
+        self.reason = reason
+
+    def __repr__(self):
+        return f"HamiltonResult({self.status!r}, reason={self.reason!r}, {self.stats})"
+
+
+class _Budget:
+    # Limit czasu (sekundy), limit rozwinięć węzłów, zewnętrzny stop() i raport postępu.
+    # Silniki wołają tick() co pewną liczbę węzłów; True oznacza przerwanie.
+    def __init__(self, time_limit: Optional[float] = None, node_limit: Optional[int] = None,
+                 progress: Optional[Callable[[SearchStats], None]] = None,
+                 progress_interval: float = 1.0, stop: Optional[Callable[[], bool]] = None,
+                 deadline: Optional[float] = None):
+        self.started = time.monotonic()
+        self.deadline = deadline
+        if time_limit is not None:
+            self.deadline = self.started + time_limit
+        self.node_limit = node_limit
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.next_progress = self.started + progress_interval
+        self.stop = stop
+        self.stats = SearchStats()
+        self.exhausted = False
+
+    def tick(self, nodes: int, depth: int = 0) -> bool:
+        now = time.monotonic()
+        stats = self.stats
+        stats.nodes = nodes
+        stats.depth = depth
+        stats.elapsed = now - self.started
+        if self.progress is not None and now >= self.next_progress:
+            self.progress(stats)
+            self.next_progress = now + self.progress_interval
+        if (self.deadline is not None and now >= self.deadline) \
+                or (self.node_limit is not None and nodes >= self.node_limit) \
+                or (self.stop is not None and self.stop()):
+            self.exhausted = True
+        return self.exhausted
+
+    def finish(self) -> SearchStats:
+        self.stats.elapsed = time.monotonic() - self.started
+        return self.stats
+
+
+def _lowest_bit(mask: int) -> int:
+    return (mask & -mask).bit_length() - 1
+
+
+def _held_karp(g, budget: _Budget) -> Optional[List[int]]:
+    n = g.n
+    if n > HELD_KARP_MAX_N:
+        raise ValueError(f"Held-Karp obsługuje co najwyżej {HELD_KARP_MAX_N} wierzchołków")
+    if n == 0:
+        return None
+
+    # Start w wierzchołku o indeksie 0; pozostałe wierzchołki i zajmują bit i - 1.
+    adj = [row >> 1 for row in g.bitset_rows()]
+    m = n - 1
+    full = (1 << m) - 1
+    # ends[mask]: zbiór wierzchołków, w których może kończyć się ścieżka
+    # ze startu przechodząca dokładnie przez wierzchołki z mask. Budżet sprawdzany
+    # przed alokacją tablicy, która przy dużym n sama zajmuje zauważalny czas.
+    if budget.tick(0, n):
+        return None
+    ends = array('Q', [0]) * (1 << m)
+    first = adj[0]
+    mask = first
+    while mask:
+        low = mask & -mask
+        ends[low] = low
+        mask ^= low
+
+    for mask in range(1, full + 1):
+        if not mask & 4095 and budget.tick(mask, n):
+            return None
+        e = ends[mask]
+        while e:
+            low = e & -e
+            e ^= low
+            nxt = adj[low.bit_length()] & ~mask & full
+            while nxt:
+                bit = nxt & -nxt
+                nxt ^= bit
+                ends[mask | bit] |= bit
+
+    closing = ends[full] & first
+    if not closing:
+        return None
+
+    # Rekonstrukcja od końca: poprzednik to dowolny koniec ścieżki bez j sąsiadujący z j.
+    reverse_path = []
+    mask = full
+    j = _lowest_bit(closing)
+    while True:
+        reverse_path.append(j + 1)
+        mask ^= 1 << j
+        if not mask:
+            break
+        j = _lowest_bit(ends[mask] & adj[j + 1])
+    path = [0] + reverse_path[::-1] + [0]
+    budget.stats.nodes = full
+    return [i + g.base for i in path]
+
+
+def held_karp(graph) -> Optional[List[int]]:
+    return _held_karp(compact_graph.freeze(graph), _Budget())
+
+
+def _index_neighbors(g) -> List[List[int]]:
+    return [[w - g.base for w in g.neighbors(v)] for v in g.vertices()]
+
+
+def _dfs_articulation(nbrs: List[List[int]]):
+    # Iteracyjny DFS Tarjana z wierzchołka 0: liczba odwiedzonych,
+    # pierwszy znaleziony punkt artykulacji i pierwszy most (indeksy).
+    n = len(nbrs)
+    disc = [-1] * n
+    low = [0] * n
+    parent = [-1] * n
+    disc[0] = 0
+    time = 1
+    visited = 1
+    root_children = 0
+    articulation = bridge = None
+    stack = [(0, iter(nbrs[0]))]
+    while stack:
+        v, it = stack[-1]
+        for w in it:
+            if disc[w] == -1:
+                parent[w] = v
+                disc[w] = low[w] = time
+                time += 1
+                visited += 1
+                stack.append((w, iter(nbrs[w])))
+                break
+            if w != parent[v]:
+                low[v] = min(low[v], disc[w])
+        else:
+            stack.pop()
+            if not stack:
+                break
+            p = parent[v]
+            low[p] = min(low[p], low[v])
+            if low[v] > disc[p] and bridge is None:
+                bridge = (p, v)
+            if p == 0:
+                root_children += 1
+            elif low[v] >= disc[p] and articulation is None:
+                articulation = p
+    if root_children > 1 and articulation is None:
+        articulation = 0
+    return visited, articulation, bridge
+
+
+def precheck(graph) -> Optional[str]:
+    # Wielomianowe warunki konieczne; zwraca powód braku cyklu albo None.
+    g = compact_graph.freeze(graph)
+    if g.n < 3:
+        return None
+    for v in g.vertices():
+        if g.vertex_degree(v) < 2:
+            return f"wierzchołek {v} ma stopień {g.vertex_degree(v)} < 2"
+    nbrs = _index_neighbors(g)
+    visited, articulation, bridge = _dfs_articulation(nbrs)
+    if visited < g.n:
+        return "graf jest niespójny"
+    if bridge is not None:
+        return f"krawędź {bridge[0] + g.base}-{bridge[1] + g.base} jest mostem"
+    if articulation is not None:
+        return f"wierzchołek {articulation + g.base} jest punktem artykulacji"
+    # Obie krawędzie wierzchołka stopnia 2 są wymuszone; wierzchołek może mieć
+    # co najwyżej dwie wymuszone krawędzie.
+    for v, row in enumerate(nbrs):
+        forced = sum(1 for w in row if len(nbrs[w]) == 2)
+        if forced > 2:
+            return f"wierzchołek {v + g.base} ma {forced} wymuszone krawędzie"
+    return None
+
+
+class _Backtracker:
+    # Przeszukiwanie z nawrotami od ścieżki-prefiksu (indeksy, prefix[0] == 0);
+    # budżet sprawdzany co CHECK_INTERVAL rozwinięć (i dokładnie na limicie węzłów).
+    CHECK_INTERVAL = 1024
+
+    def __init__(self, g, budget: Optional[_Budget] = None):
+        self.g = g
+        self.budget = budget or _Budget()
+        self.rows = g.bitset_rows()
+        self.nbrs = _index_neighbors(g)
+        # avail[w]: sąsiedzi w, którzy nie są jeszcze wewnętrznymi wierzchołkami ścieżki.
+        self.avail = [len(row) for row in self.nbrs]
+        self.stopped = False
+        self.nodes = 0
+        self.max_depth = 0
+        self.next_check = self._next_check()
+        self.path: List[int] = []
+
+    def _next_check(self) -> int:
+        limit = self.budget.node_limit
+        step = self.nodes + self.CHECK_INTERVAL
+        return step if limit is None else min(step, limit)
+
+    def reachable(self, current: int, unvisited: int) -> bool:
+        rows = self.rows
+        reach = frontier = rows[current] & unvisited
+        while frontier:
+            grow = 0
+            while frontier:
+                low = frontier & -frontier
+                frontier ^= low
+                grow |= rows[low.bit_length() - 1]
+            frontier = grow & unvisited & ~reach
+            reach |= frontier
+        return reach == unvisited
+
+    def _set_interior(self, v: int, delta: int):
+        for w in self.nbrs[v]:
+            self.avail[w] += delta
+
+    def run(self, prefix: List[int]) -> Optional[List[int]]:
+        n = self.g.n
+        if n == 0:
+            return None
+        for v in prefix[1:-1]:
+            self._set_interior(v, -1)
+        self.path = list(prefix)
+        unvisited = (1 << n) - 1
+        for v in prefix:
+            unvisited ^= 1 << v
+        found = self.backtrack(prefix[-1], unvisited)
+        for v in prefix[1:-1]:
+            self._set_interior(v, 1)
+        stats = self.budget.stats
+        stats.nodes, stats.max_depth = self.nodes, self.max_depth
+        if found:
+            stats.depth = len(self.path)
+            return [i + self.g.base for i in self.path + [0]]
+        return None
+
+    def _enter(self, current: int, unvisited: int):
+        # Wejście do węzła drzewa: True - domknięty cykl, None - ślepa gałąź,
+        # w przeciwnym razie ramka [wierzchołek, nieodwiedzone, kandydaci, indeks, wewnętrzny].
+        self.nodes += 1
+        depth = len(self.path)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.nodes >= self.next_check:
+            self.budget.stats.max_depth = self.max_depth
+            self.stopped = self.budget.tick(self.nodes, depth)
+            self.next_check = self._next_check()
+            if self.stopped:
+                return None
+        rows, avail = self.rows, self.avail
+        if not unvisited:
+            return True if rows[current] & 1 else None
+        # Start musi mieć jeszcze nieodwiedzonego sąsiada do domknięcia cyklu,
+        # a nieodwiedzone wierzchołki muszą być osiągalne z bieżącego.
+        if not rows[0] & unvisited or not self.reachable(current, unvisited):
+            return None
+        candidates = [w for w in self.nbrs[current] if unvisited >> w & 1]
+        interior = current != 0
+        if interior:
+            self._set_interior(current, -1)
+            # Sąsiad z avail < 2 nie zostanie dokończony inaczej niż jako następny.
+            tight = [w for w in candidates if avail[w] < 2]
+            if len(tight) > 1 or (tight and avail[tight[0]] < 1):
+                candidates = []
+            elif tight:
+                candidates = tight
+        candidates.sort(key=avail.__getitem__)
+        return [current, unvisited, candidates, 0, interior]
+
+    def backtrack(self, current: int, unvisited: int) -> bool:
+        # Jawny stos ramek zamiast rekurencji: głębokość ograniczona tylko pamięcią.
+        path = self.path
+        root_depth = len(path)
+        stack = []
+        found = False
+        while True:
+            frame = self._enter(current, unvisited)
+            if frame is True:
+                found = True
+                break
+            if frame is not None:
+                stack.append(frame)
+            elif len(path) > root_depth:
+                path.pop()
+            if self.stopped:
+                break
+            while stack:
+                frame = stack[-1]
+                if frame[3] < len(frame[2]):
+                    current = frame[2][frame[3]]
+                    frame[3] += 1
+                    unvisited = frame[1] ^ (1 << current)
+                    path.append(current)
+                    break
+                stack.pop()
+                if frame[4]:
+                    self._set_interior(frame[0], 1)
+                if len(path) > root_depth:
+                    path.pop()
+            else:
+                break
+        for frame in stack:
+            if frame[4]:
+                self._set_interior(frame[0], 1)
+        return found
+
+
+def _backtracking(g, budget: _Budget) -> Optional[List[int]]:
+    # Cykl Hamiltona przechodzi przez każdy wierzchołek, więc wystarczy jeden start.
+    return _Backtracker(g, budget).run([0])
+
+
+def backtracking(graph) -> Optional[List[int]]:
+    return _backtracking(compact_graph.freeze(graph), _Budget())
+
+
+class _BitsetSearcher:
+    # Silnik na maskach bitowych: sąsiedztwo i zbiór nieodwiedzonych to liczby całkowite,
+    # kandydaci to adj[v] & nieodwiedzone; stan nie wymaga cofania przy nawrocie.
+    CHECK_INTERVAL = 1024
+
+    def __init__(self, g, budget: Optional[_Budget] = None):
+        self.g = g
+        self.budget = budget or _Budget()
+        self.adj = g.bitset_rows()
+        self.nodes = 0
+        self.max_depth = 0
+        self.stopped = False
+
+    def _expand(self, prev: int, current: int, unvisited: int):
+        # Kandydaci z węzła albo None, gdy gałąź na pewno nie prowadzi do cyklu.
+        adj = self.adj
+        if not unvisited:
+            return [] if adj[current] & 1 else None
+        if not adj[0] & unvisited:
+            return None
+        # Osiągalność nieodwiedzonych z bieżącego wierzchołka.
+        reach = frontier = adj[current] & unvisited
+        while frontier:
+            grow = 0
+            while frontier:
+                low = frontier & -frontier
+                frontier ^= low
+                grow |= adj[low.bit_length() - 1]
+            frontier = grow & unvisited & ~reach
+            reach |= frontier
+        if reach != unvisited:
+            return None
+        # Stopnie: tylko sąsiedzi prev (który właśnie stał się wewnętrzny) stracili opcję.
+        current_bit = 1 << current
+        open_ends = unvisited | current_bit | 1
+        forced = 0
+        if prev >= 0:
+            affected = adj[prev] & unvisited
+            while affected:
+                low = affected & -affected
+                affected ^= low
+                row = adj[low.bit_length() - 1]
+                count = (row & open_ends).bit_count()
+                if count < 2:
+                    return None
+                if count == 2 and row & current_bit:
+                    if forced:
+                        return None
+                    forced = low
+        candidates = forced or adj[current] & unvisited
+        order = []
+        while candidates:
+            low = candidates & -candidates
+            candidates ^= low
+            w = low.bit_length() - 1
+            order.append(((adj[w] & unvisited).bit_count(), w))
+        order.sort()
+        return [w for _, w in order]
+
+    def run(self, prefix: List[int]) -> Optional[List[int]]:
+        n = self.g.n
+        if n == 0:
+            return None
+        path = list(prefix)
+        unvisited = (1 << n) - 1
+        for v in prefix:
+            unvisited ^= 1 << v
+        prev = prefix[-2] if len(prefix) > 1 else -1
+        root = self._expand(prev, prefix[-1], unvisited)
+        stack = [] if root is None else [[prefix[-1], unvisited, root, 0]]
+        self.max_depth = max(self.max_depth, len(path))
+        next_check = self.CHECK_INTERVAL
+        node_limit = self.budget.node_limit
+        if node_limit is not None:
+            next_check = min(next_check, node_limit)
+        while stack:
+            frame = stack[-1]
+            current, unvisited, candidates, index = frame
+            if not unvisited:
+                self._record(len(path))
+                path.append(0)
+                return [i + self.g.base for i in path]
+            if index == len(candidates):
+                stack.pop()
+                path.pop()
+                continue
+            frame[3] = index + 1
+            w = candidates[index]
+            self.nodes += 1
+            if self.nodes >= next_check:
+                self.budget.stats.max_depth = self.max_depth
+                self.stopped = self.budget.tick(self.nodes, len(path))
+                next_check = self.nodes + self.CHECK_INTERVAL
+                if node_limit is not None:
+                    next_check = min(next_check, node_limit)
+                if self.stopped:
+                    break
+            rest = unvisited ^ (1 << w)
+            child = self._expand(current, w, rest)
+            if child is not None:
+                path.append(w)
+                if len(path) > self.max_depth:
+                    self.max_depth = len(path)
+                stack.append([w, rest, child, 0])
+        self._record(0)
+        return None
+
+    def _record(self, depth: int):
+        stats = self.budget.stats
+        stats.nodes, stats.max_depth = self.nodes, self.max_depth
+        if depth:
+            stats.depth = depth
+
+
+def _bitset(g, budget: _Budget) -> Optional[List[int]]:
+    return _BitsetSearcher(g, budget).run([0])
+
+
+def bitset_search(graph) -> Optional[List[int]]:
+    return _bitset(compact_graph.freeze(graph), _Budget())
+
+
+def _enumerate(g) -> Iterator[List[int]]:
+    # Wszystkie cykle ze startem w wierzchołku 0; z pary cykl/odwrócony cykl zostaje
+    # tylko ten, w którym drugi wierzchołek ma mniejszy indeks niż ostatni.
+    # Zwracana lista ścieżki jest współdzielona - odbiorca kopiuje ją, jeśli trzeba.
+    n = g.n
+    if n < 3:
+        return
+    searcher = _BitsetSearcher(g)
+    adj = searcher.adj
+    unvisited = ((1 << n) - 1) ^ 1
+    root = searcher._expand(-1, 0, unvisited)
+    if root is None:
+        return
+    path = [0]
+    stack = [[0, unvisited, root, 0]]
+    while stack:
+        frame = stack[-1]
+        current, unvisited, candidates, index = frame
+        if not unvisited:
+            if current > path[1]:
+                yield path
+            stack.pop()
+            path.pop()
+            continue
+        if index == len(candidates):
+            stack.pop()
+            if stack:
+                path.pop()
+            continue
+        frame[3] = index + 1
+        w = candidates[index]
+        rest = unvisited ^ (1 << w)
+        # Ostatni wierzchołek musi być sąsiadem startu o indeksie większym od drugiego.
+        if len(path) > 1 and not (adj[0] & (rest | 1 << w)) >> (path[1] + 1):
+            continue
+        child = searcher._expand(current, w, rest)
+        if child is not None:
+            path.append(w)
+            stack.append([w, rest, child, 0])
+
+
+def iter_hamilton_cycles(graph, limit: Optional[int] = None) -> Iterator[List[int]]:
+    if limit is not None and limit <= 0:
+        return
+    g = compact_graph.freeze(graph)
+    found = 0
+    for path in _enumerate(g):
+        found += 1
+        yield [i + g.base for i in path] + [g.base]
+        if limit is not None and found >= limit:
+            return
+
+
+def _count_dp(g) -> int:
+    # Liczba ścieżek Hamiltona ze startu 0 kończących się w każdym wierzchołku,
+    # bez przechowywania ścieżek: paths[mask * m + j].
+    n = g.n
+    m = n - 1
+    adj = [row >> 1 for row in g.bitset_rows()]
+    paths = array('Q', [0]) * (m << m)
+    for j in range(m):
+        if adj[0] >> j & 1:
+            paths[(1 << j) * m + j] = 1
+    for mask in range(1, 1 << m):
+        base = mask * m
+        for j in range(m):
+            count = paths[base + j]
+            if not count:
+                continue
+            nxt = adj[j + 1] & ~mask
+            while nxt:
+                bit = nxt & -nxt
+                nxt ^= bit
+                paths[(mask | bit) * m + bit.bit_length() - 1] += count
+    full = (1 << m) - 1
+    closing = sum(paths[full * m + j] for j in range(m) if adj[0] >> j & 1)
+    return closing // 2
+
+
+def count_hamilton_cycles(graph, limit: Optional[int] = None) -> int:
+    g = compact_graph.freeze(graph)
+    if g.n < 3:
+        return 0
+    if limit is None and g.n <= HELD_KARP_AUTO_MAX_N:
+        return _count_dp(g)
+    count = 0
+    for _ in _enumerate(g):
+        count += 1
+        if limit is not None and count >= limit:
+            break
+    return count
+
+
+def _split_prefixes(g, min_tasks: int, max_depth: int) -> List[List[int]]:
+    # Rozwija drzewo przeszukiwania poziomami, aż będzie dość prefiksów dla puli.
+    nbrs = _index_neighbors(g)
+    prefixes = [[0]]
+    for _ in range(max_depth):
+        if len(prefixes) >= min_tasks:
+            break
+        expanded = []
+        for prefix in prefixes:
+            seen = set(prefix)
+            expanded.extend(prefix + [w] for w in nbrs[prefix[-1]] if w not in seen)
+        if not expanded:
+            break
+        prefixes = expanded
+    return prefixes
+
+
+_worker_graph = None
+_worker_found = None
+_worker_nodes = None
+
+
+def _init_worker(g, found, nodes):
+    global _worker_graph, _worker_found, _worker_nodes
+    _worker_graph = g
+    _worker_found = found
+    _worker_nodes = nodes
+
+
+def _solve_prefix(prefix: List[int], deadline: Optional[float], node_limit: Optional[int]):
+    if _worker_found.is_set():
+        return None, 0, True
+    reported = 0
+
+    def stop() -> bool:
+        # Węzły zadania dopisywane do licznika wspólnego dla całej puli, więc limit
+        # węzłów obejmuje wszystkie procesy razem.
+        nonlocal reported
+        with _worker_nodes.get_lock():
+            _worker_nodes.value += budget.stats.nodes - reported
+            total = _worker_nodes.value
+        reported = budget.stats.nodes
+        return _worker_found.is_set() or (node_limit is not None and total >= node_limit)
+
+    budget = _Budget(stop=stop, deadline=deadline)
+    backtracker = _Backtracker(_worker_graph, budget)
+    path = backtracker.run(prefix)
+    with _worker_nodes.get_lock():
+        _worker_nodes.value += backtracker.nodes - reported
+    return path, backtracker.nodes, backtracker.stopped
+
+
+def _parallel(g, budget: _Budget, workers: Optional[int] = None,
+              split_depth: int = 3) -> Optional[List[int]]:
+    workers = workers or os.cpu_count() or 1
+    if g.n < 3 or workers == 1:
+        return _backtracking(g, budget)
+    prefixes = _split_prefixes(g, 4 * workers, split_depth)
+    g.bitset_rows()
+    context = multiprocessing.get_context()
+    found = context.Event()
+    shared_nodes = context.Value('q', 0)
+    path = None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(g, found, shared_nodes)) as pool:
+        futures = [pool.submit(_solve_prefix, prefix, budget.deadline, budget.node_limit)
+                   for prefix in prefixes]
+        for future in as_completed(futures):
+            path, _, stopped = future.result()
+            exhausted = budget.tick(shared_nodes.value)
+            if path is not None or stopped or exhausted:
+                # Pierwszy wynik (lub wyczerpany budżet) kończy wszystko: pozostałe
+                # zadania są anulowane, a uruchomione przerywają się przy sprawdzeniu flagi.
+                budget.exhausted = path is None
+                found.set()
+                for other in futures:
+                    other.cancel()
+                break
+    # Po zamknięciu puli licznik obejmuje też węzły zadań przerwanych w trakcie.
+    budget.stats.nodes = shared_nodes.value
+    return path
+
+
+def parallel_backtracking(graph, workers: Optional[int] = None, split_depth: int = 3) -> Optional[List[int]]:
+    return _parallel(compact_graph.freeze(graph), _Budget(), workers, split_depth)
+
+
+# Szybka ścieżka dla gęstych grafów: warunek Ore (Dirac jest jego szczególnym
+# przypadkiem) gwarantuje cykl, który da się zbudować konstruktywnie; gdy warunek
+# nie zachodzi, heurystyka rotacji Pósy zwykle i tak szybko znajduje cykl.
+POSA_MIN_DENSITY = 0.1
+POSA_ROTATIONS_PER_VERTEX = 20
+POSA_RESTARTS = 3
+
+
+def dirac_condition(graph) -> bool:
+    g = compact_graph.freeze(graph)
+    return g.n >= 3 and 2 * min(g.degrees()) >= g.n
+
+
+def ore_condition(graph) -> bool:
+    # deg(u) + deg(v) >= n dla każdej pary niesąsiednich u, v. Dla danego u wystarczy
+    # sprawdzić wierzchołki o stopniu < n - deg(u): prefiks porządku według stopni,
+    # trzymany jako maska bitowa.
+    g = compact_graph.freeze(graph)
+    n = g.n
+    if n < 3:
+        return False
+    degrees = g.degrees()
+    if 2 * min(degrees) >= n:
+        return True
+    rows = g.bitset_rows()
+    order = sorted(range(n), key=degrees.__getitem__)
+    sorted_degrees = [degrees[i] for i in order]
+    prefix = [0]
+    for i in order:
+        prefix.append(prefix[-1] | 1 << i)
+    for u in range(n):
+        if prefix[bisect_left(sorted_degrees, n - degrees[u])] & ~rows[u] & ~(1 << u):
+            return False
+    return True
+
+
+def _closed(g, order: List[int]) -> List[int]:
+    start = order.index(0)
+    order = order[start:] + order[:start]
+    return [i + g.base for i in order] + [g.base]
+
+
+def _ore_cycle(g, budget: _Budget) -> Optional[List[int]]:
+    # Palmer: wierzchołki ułożone w okrąg, "luka" to para kolejnych niesąsiednich.
+    # Luka między p[n-1] i p[0] znika po odwróceniu p[k+1..n-1] dla k z p[0] ~ p[k+1]
+    # i p[n-1] ~ p[k]; przy warunku Ore takie k zawsze istnieje, a luk ubywa.
+    n = g.n
+    rows = g.bitset_rows()
+    # Początkowy układ to ścieżka zachłanna, więc luk jest zwykle niewiele.
+    unvisited = (1 << n) - 2
+    order = [0]
+    current = 0
+    while unvisited:
+        candidates = rows[current] & unvisited
+        current = _lowest_bit(candidates or unvisited)
+        unvisited ^= 1 << current
+        order.append(current)
+    fixes = 0
+    while True:
+        gap = next((i for i in range(n) if not rows[order[i - 1]] >> order[i] & 1), None)
+        if gap is None:
+            budget.stats.nodes = fixes
+            return _closed(g, order)
+        order = order[gap:] + order[:gap]
+        first, last = rows[order[0]], rows[order[-1]]
+        k = next((k for k in range(n - 2) if first >> order[k + 1] & 1 and last >> order[k] & 1), None)
+        if k is None:
+            return None
+        order[k + 1:] = order[:k:-1]
+        fixes += 1
+        if budget.tick(fixes, n):
+            return None
+
+
+def _posa(g, budget: _Budget, seed: Optional[int] = None) -> Optional[List[int]]:
+    # Rotacje Pósy: ścieżka rośnie, dopóki koniec ma nieodwiedzonego sąsiada; potem
+    # losowy sąsiad w = p[i] końca wyznacza rotację (odwrócenie p[i+1..]), która
+    # daje nowy koniec. Pełna ścieżka z końcem sąsiadującym z początkiem to cykl.
+    n = g.n
+    rows = g.bitset_rows()
+    nbrs = _index_neighbors(g)
+    rng = random.Random(seed)
+    rotations = 0
+    for _ in range(POSA_RESTARTS):
+        start = rng.randrange(n)
+        path = [start]
+        pos = [-1] * n
+        pos[start] = 0
+        unvisited = ((1 << n) - 1) ^ (1 << start)
+        for _ in range(POSA_ROTATIONS_PER_VERTEX * n):
+            end = path[-1]
+            free = rows[end] & unvisited
+            while free:
+                v = _lowest_bit(free)
+                pos[v] = len(path)
+                path.append(v)
+                unvisited ^= 1 << v
+                end = v
+                free = rows[end] & unvisited
+            if len(path) == n and rows[end] >> path[0] & 1:
+                budget.stats.nodes = rotations
+                return _closed(g, path)
+            pivots = [w for w in nbrs[end] if pos[w] != -1 and pos[w] < len(path) - 2]
+            if not pivots:
+                break
+            i = pos[rng.choice(pivots)]
+            path[i + 1:] = path[:i:-1]
+            for j in range(i + 1, len(path)):
+                pos[path[j]] = j
+            rotations += 1
+            if not rotations & 63 and budget.tick(rotations, len(path)):
+                return None
+    budget.stats.nodes = rotations
+    return None
+
+
+def _fast_path(g, budget: _Budget):
+    # (cykl albo None, nazwa użytej metody)
+    if g.n < 3:
+        return None, None
+    if ore_condition(g):
+        return _ore_cycle(g, budget), "warunek Diraca" if dirac_condition(g) else "warunek Ore"
+    if g.edge_count() >= POSA_MIN_DENSITY * g.n * (g.n - 1) / 2:
+        return _posa(g, budget), "heurystyka Pósy"
+    return None, None
+
+
+def ore_cycle(graph) -> Optional[List[int]]:
+    g = compact_graph.freeze(graph)
+    return _ore_cycle(g, _Budget()) if ore_condition(g) else None
+
+
+def posa_cycle(graph, seed: Optional[int] = None) -> Optional[List[int]]:
+    g = compact_graph.freeze(graph)
+    return _posa(g, _Budget(), seed) if g.n >= 3 else None
+
+
+METHODS = {
+    "backtracking": _backtracking,
+    "held-karp": _held_karp,
+    "parallel": _parallel,
+    "bitset": _bitset,
+}
+
+
+def _edge_test(graph):
+    # (n, base, has_edge) bez zamrażania: graf mutowalny odpowiada wprost ze zbiorów
+    # sąsiedztwa, więc sprawdzenie nie przebudowuje nieaktualnego CSR.
+    if isinstance(graph, compact_graph.CompactGraph):
+        return graph.n, graph.base, graph.has_edge
+    if hasattr(graph, "adjacency"):
+        adjacency, n, base = graph.adjacency, graph.n, 1
+    elif hasattr(graph, "adjacency_list"):
+        adjacency, n, base = graph.adjacency_list, graph.num_nodes, 0
+    elif hasattr(graph, "adj"):
+        adjacency, n, base = graph.adj, graph.n, 0
+    else:
+        g = compact_graph.freeze(graph)
+        return g.n, g.base, g.has_edge
+    return n, base, lambda u, v: v in adjacency.get(u, ())
+
+
+def verify_cycle(graph, cycle: Optional[List[int]]) -> bool:
+    # Certyfikat w O(n) sprawdzeń krawędzi: zamknięty cykl przez każdy wierzchołek raz.
+    n, base, has_edge = _edge_test(graph)
+    if not cycle or len(cycle) != n + 1 or cycle[0] != cycle[-1] or n < 3:
+        return False
+    seen = bytearray(n)
+    for v in cycle[:-1]:
+        i = v - base
+        if not 0 <= i < n or seen[i]:
+            return False
+        seen[i] = 1
+    return all(has_edge(u, v) for u, v in zip(cycle, cycle[1:]))
+
+
+def search(graph, method: str = "auto", time_limit: Optional[float] = None,
+           node_limit: Optional[int] = None, progress: Optional[Callable[[SearchStats], None]] = None,
+           progress_interval: float = 1.0, check: bool = True, certificate=None) -> HamiltonResult:
+    # certificate: cykl sprawdzany przed szukaniem tylko wtedy, gdy go podano;
+    # "auto" bierze zasiany cykl grafu (hamiltonian_cycle). Poprawny certyfikat
+    # jest zwracany od razu, niepoprawny jest pomijany.
+    budget = _Budget(time_limit, node_limit, progress, progress_interval)
+    if certificate == "auto":
+        certificate = getattr(graph, "hamiltonian_cycle", None)
+    if certificate and verify_cycle(graph, certificate):
+        if instrumentation.enabled:
+            instrumentation.count("hamilton.certificate")
+        return HamiltonResult(FOUND, list(certificate), budget.finish(), reason="certyfikat")
+    # Grafy mutowalne śledzą składowe na bieżąco - niespójny odpada bez zamrażania.
+    # CompactGraph liczyłby je od zera, więc spójność sprawdza mu precheck.
+    if check and not isinstance(graph, compact_graph.CompactGraph) \
+            and hasattr(graph, "is_connected") and not graph.is_connected():
+        if instrumentation.enabled:
+            instrumentation.count("hamilton.precheck_rejected")
+        return HamiltonResult(ABSENT, stats=budget.finish(), reason="graf jest niespójny")
+    g = compact_graph.freeze(graph)
+    if check:
+        reason = precheck(g)
+        if reason is not None:
+            if instrumentation.enabled:
+                instrumentation.count("hamilton.precheck_rejected")
+            return HamiltonResult(ABSENT, stats=budget.finish(), reason=reason)
+    if method == "auto":
+        # Wielomianowa szybka ścieżka, a dopiero po niej przeszukiwanie wyczerpujące.
+        cycle, fast = _fast_path(g, budget)
+        if fast is not None and instrumentation.enabled:
+            instrumentation.count(f"hamilton.fast_path.{'found' if cycle else 'missed'}")
+        if cycle is not None:
+            return HamiltonResult(FOUND, cycle, budget.finish(), reason=fast)
+        if budget.exhausted:
+            return HamiltonResult(UNKNOWN, stats=budget.finish(), reason="wyczerpany budżet")
+        method = "held-karp" if g.n <= HELD_KARP_AUTO_MAX_N else "bitset"
+    if method not in METHODS:
+        raise ValueError(f"Nieznana metoda: {method}")
+    cycle = METHODS[method](g, budget)
+    stats = budget.finish()
+    if instrumentation.enabled:
+        instrumentation.count(f"hamilton.{method}.nodes", stats.nodes)
+    if cycle is not None:
+        return HamiltonResult(FOUND, cycle, stats)
+    if budget.exhausted:
+        return HamiltonResult(UNKNOWN, stats=stats, reason="wyczerpany budżet")
+    return HamiltonResult(ABSENT, stats=stats, reason="przeszukiwanie wyczerpujące")
+
+
+def hamilton_cycle(graph, method: str = "auto", check: bool = True) -> Optional[List[int]]:
+    return search(graph, method, check=check).cycle
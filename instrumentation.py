@@ -0,0 +1,80 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+# Pomiary włączane jawnie przez enable(). Gorące pętle zliczają w zmiennych
+# lokalnych i przekazują wynik jednym wywołaniem count() pod warunkiem
+# "if instrumentation.enabled", więc po wyłączeniu koszt to jedno sprawdzenie flagi.
+enabled = False
+_counters = {}
+_stages = {}
+_peak = 0
+
+
+def enable(memory: bool = False):
+    global enabled
+    reset()
+    enabled = True
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global enabled
+    enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def reset():
+    global _peak
+    _counters.clear()
+    _stages.clear()
+    _peak = 0
+
+
+def count(name: str, value: int = 1):
+    _counters[name] = _counters.get(name, 0) + value
+
+
+@contextmanager
+def stage(name: str):
+    if not enabled:
+        yield
+        return
+    global _peak
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        entry = _stages.setdefault(name, {"calls": 0, "total": 0.0, "max": 0.0})
+        entry["calls"] += 1
+        entry["total"] += elapsed
+        entry["max"] = max(entry["max"], elapsed)
+        if tracing:
+            # Szczyt liczony od początku etapu; etap zagnieżdżony zeruje szczyt
+            # etapu zewnętrznego, więc zewnętrzny widzi tylko resztę swojego czasu.
+            peak = tracemalloc.get_traced_memory()[1]
+            entry["peak_memory"] = max(entry.get("peak_memory", 0), peak)
+            _peak = max(_peak, peak)
+
+
+def report() -> dict:
+    result = {"counters": dict(_counters), "stages": {name: dict(entry) for name, entry in _stages.items()}}
+    if tracemalloc.is_tracing():
+        result["peak_memory"] = max(_peak, tracemalloc.get_traced_memory()[1])
+    return result
+
+
+def write_report(filename: Optional[str] = None) -> str:
+    text = json.dumps(report(), indent=2)
+    if filename:
+        with open(filename, "w") as f:
+            f.write(text + "\n")
+    return text
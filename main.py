@@ -1,6 +1,8 @@
 import argparse
 from graph import UndirectedGraph
+import instrumentation
 from algorithms import find_euler_cycle, find_hamilton_cycle
+from hamilton import METHODS
 
 
 if __name__ == "__main__":
@@ -11,27 +13,39 @@ if __name__ == "__main__":
     parser.add_argument("--non-hamilton", action="store_true", help="Generate a Non-Hamiltonian graph")
     parser.add_argument("nodes", type=int, help="Number of nodes (must be > 10)")
     parser.add_argument("saturation", type=int, help="Edge saturation percentage (e.g., 30, 50, 70)")
+    parser.add_argument("--method", choices=["auto", *METHODS], default="auto", help="Hamilton cycle solver")
+    parser.add_argument("--time-limit", type=float, help="Hamilton cycle search budget in seconds")
+    parser.add_argument("--certificate", action="store_true",
+                        help="Accept the planted Hamiltonian cycle instead of searching when it is still valid")
+    parser.add_argument("--report", help="Write instrumentation counters, timers and peak memory to this JSON file")
 
     args = parser.parse_args()
 
     if args.nodes <= 10:
         raise ValueError("Number of nodes must be greater than 10")
 
+    if args.report:
+        instrumentation.enable(memory=True)
+
     graph = UndirectedGraph(args.nodes)
 
-    if args.hamilton:
-        graph.generate_hamiltonian_cycle()
-        graph.fill_to_saturation(args.saturation)
-        graph.add_short_cycles_for_even_degrees()
-    elif args.non_hamilton:
-        graph.generate_hamiltonian_cycle()
-        graph.fill_to_saturation(args.saturation)
-        graph.isolate_node()
-    else:
-        raise ValueError("Specify either --hamilton or --non-hamilton")
+    with instrumentation.stage("generation"):
+        if args.hamilton:
+            graph.generate_hamiltonian_cycle()
+            graph.fill_to_saturation(args.saturation)
+            graph.add_short_cycles_for_even_degrees()
+        elif args.non_hamilton:
+            graph.generate_hamiltonian_cycle()
+            graph.fill_to_saturation(args.saturation)
+            graph.isolate_node()
+        else:
+            raise ValueError("Specify either --hamilton or --non-hamilton")
 
     graph.display_adjacency_list()
     print()
     find_euler_cycle(graph)
     print()
-    find_hamilton_cycle(graph)
+    find_hamilton_cycle(graph, args.method, args.time_limit, certificate="auto" if args.certificate else None)
+
+    if args.report:
+        instrumentation.write_report(args.report)
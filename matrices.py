@@ -0,0 +1,100 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import TextIO
+
+import compact_graph
+
+# Wiersze macierzy składane jako bajty z gotowego szablonu komórek (kopiowanie
+# szablonu + wpisanie jedynek), zapisywane do strumienia paczkami wierszy.
+ROWS_PER_WRITE = 64
+
+
+def _flush(stream: TextIO, rows: list):
+    if rows:
+        stream.write("".join(rows))
+        rows.clear()
+
+
+def write_adjacency_matrix(graph, stream: TextIO):
+    g = compact_graph.freeze(graph)
+    n, base = g.n, g.base
+    col_width = len(str(base + n - 1)) + 1
+    stream.write(" " * col_width + " |" + "".join(f"{v:>{col_width}}" for v in g.vertices()) + "\n")
+    stream.write("-" * (col_width + 1) + "+" + "-" * (n * col_width) + "\n")
+    template = (b" " * (col_width - 1) + b"0") * n
+    one = ord("1")
+    rows = []
+    for u in g.vertices():
+        row = bytearray(template)
+        for v in g.neighbors(u):
+            row[(v - base) * col_width + col_width - 1] = one
+        rows.append(f"{u:>{col_width}} |" + row.decode("ascii") + "\n")
+        if len(rows) == ROWS_PER_WRITE:
+            _flush(stream, rows)
+    _flush(stream, rows)
+
+
+def _edge_numbering(g):
+    # Krawędzie (u, v), u < v, numerowane leksykograficznie: first[i] to numer pierwszej
+    # krawędzi z mniejszym końcem w wierzchołku i, upper[i] to pozycja w CSR pierwszego
+    # sąsiada większego od niego.
+    first = array('q', [0])
+    upper = array('q')
+    for u in g.vertices():
+        i = u - g.base
+        lo, hi = g.offsets[i], g.offsets[i + 1]
+        pos = bisect_right(g.targets, u, lo, hi)
+        upper.append(pos)
+        first.append(first[-1] + hi - pos)
+    return first, upper
+
+
+def _incident_edges(g, first, upper, v: int):
+    # Numery krawędzi incydentnych z v, rosnąco.
+    i = v - g.base
+    lo = g.offsets[i]
+    for u in g.targets[lo:upper[i]]:
+        j = u - g.base
+        pos = bisect_left(g.targets, v, upper[j], g.offsets[j + 1])
+        yield first[j] + pos - upper[j]
+    yield from range(first[i], first[i + 1])
+
+
+def write_incidence_matrix(graph, stream: TextIO, fmt: str = "dense"):
+    # fmt: "dense" - pełna macierz jak dotychczas, "csr" - wiersz "v: e1 e2 ...",
+    # "coo" - para "v e" w linii; numery krawędzi od 1 jak w nagłówku macierzy.
+    g = compact_graph.freeze(graph)
+    first, upper = _edge_numbering(g)
+    edges = first[-1]
+    rows = []
+    if fmt == "dense":
+        vertex_col_width = len(str(g.base + g.n - 1)) + 1
+        edge_col_width = 3
+        header = [" " * vertex_col_width + " |"]
+        header.extend(f"e{i + 1:>{edge_col_width - 1}} " for i in range(edges))
+        stream.write("".join(header) + "\n")
+        stream.write("-" * vertex_col_width + "+" + "-" * (edges * (edge_col_width + 1)) + "\n")
+        template = (b" " * (edge_col_width - 1) + b"0 ") * edges
+        one = ord("1")
+        for v in g.vertices():
+            row = bytearray(template)
+            for e in _incident_edges(g, first, upper, v):
+                row[e * (edge_col_width + 1) + edge_col_width - 1] = one
+            rows.append(f"{v:>{vertex_col_width}} |" + row.decode("ascii") + "\n")
+            if len(rows) == ROWS_PER_WRITE:
+                _flush(stream, rows)
+    elif fmt == "csr":
+        stream.write(f"# wierzchołki: {g.n}, krawędzie: {edges}\n")
+        for v in g.vertices():
+            rows.append(f"{v}: " + " ".join(str(e + 1) for e in _incident_edges(g, first, upper, v)) + "\n")
+            if len(rows) == ROWS_PER_WRITE:
+                _flush(stream, rows)
+    elif fmt == "coo":
+        stream.write(f"# wierzchołki: {g.n}, krawędzie: {edges}\n")
+        for v in g.vertices():
+            rows.append("".join(f"{v} {e + 1}\n" for e in _incident_edges(g, first, upper, v)))
+            if len(rows) == ROWS_PER_WRITE:
+                _flush(stream, rows)
+    else:
+        raise ValueError(f"Nieznany format: {fmt}")
+    _flush(stream, rows)
@@ -1,39 +1,92 @@
 import argparse
 import random
+import sys
 from collections import defaultdict, deque
+import euler
+import hamilton
+from compact_graph import CompactGraph, freeze
+from sampling import sample_missing_pairs
+from union_find import DisjointSet
 
 class Graph:
     def __init__(self, n):
         self.n = n
         self.adj = defaultdict(set)
+        self.m = 0
+        self.version = 0
+        self._frozen = None
+        self.odd = set()
+        self._components = DisjointSet(n)
+
+    def _flip_parity(self, v):
+        if v in self.odd:
+            self.odd.remove(v)
+        else:
+            self.odd.add(v)
 
     def add_edge(self, u, v):
-        if u != v:
+        if u != v and v not in self.adj[u]:
             self.adj[u].add(v)
             self.adj[v].add(u)
+            self._flip_parity(u)
+            self._flip_parity(v)
+            self.m += 1
+            self.version += 1
+            if self._components is not None:
+                self._components.union(u, v)
+
+    def remove_edge(self, u, v):
+        if v in self.adj[u]:
+            self.adj[u].remove(v)
+            self.adj[v].remove(u)
+            self._flip_parity(u)
+            self._flip_parity(v)
+            self.m -= 1
+            self.version += 1
+            self._components = None
+
+    def components(self):
+        if self._components is None:
+            self._components = DisjointSet.from_edges(
+                self.n, ((u, v) for u, nbrs in self.adj.items() for v in nbrs if u < v))
+        return self._components
+
+    def is_connected(self):
+        return self.components().count <= 1
 
     def degree_even(self):
-        return all(len(self.adj[v]) % 2 == 0 for v in self.adj)
+        return not self.odd
 
     def print_graph(self):
         print("Graph (adjacency list):")
-        for u in range(self.n):
-            print(f"{u}: {sorted(self.adj[u])}")
+        frozen = self.freeze()
+        for u in frozen.vertices():
+            print(f"{u}: {list(frozen.neighbors(u))}")
 
     def edge_count(self):
-        return sum(len(neigh) for neigh in self.adj.values()) // 2
+        return self.m
 
     def total_possible_edges(self):
         return self.n * (self.n - 1) // 2
 
-    def add_short_cycles_for_even_degrees(self):
-        attempts = 0
-        while not self.degree_even() and attempts < 1000:
-            a, b, c = random.sample(range(self.n), 3)
-            self.add_edge(a, b)
-            self.add_edge(b, c)
-            self.add_edge(c, a)
-            attempts += 1
+    def add_short_cycles_for_even_degrees(self, max_attempts=1000):
+        # Pair up odd vertices: add a-b, or the path a-w-b if a-b already exists,
+        # and only remove a-b when no free w is found.
+        odd = list(self.odd)
+        random.shuffle(odd)
+        for i in range(0, len(odd), 2):
+            a, b = odd[i], odd[i + 1]
+            if b not in self.adj[a]:
+                self.add_edge(a, b)
+                continue
+            for _ in range(max_attempts):
+                w = random.randrange(self.n)
+                if w != a and w != b and w not in self.adj[a] and w not in self.adj[b]:
+                    self.add_edge(a, w)
+                    self.add_edge(w, b)
+                    break
+            else:
+                self.remove_edge(a, b)
 
     def generate_hamiltonian_cycle(self):
         nodes = list(range(self.n))
@@ -41,69 +94,48 @@ class Graph:
         for i in range(len(nodes)):
             self.add_edge(nodes[i], nodes[(i + 1) % len(nodes)])
 
-    def fill_to_saturation(self, target_saturation):
+    def fill_to_saturation(self, target_saturation, mode="sample"):
         target_edges = int(self.total_possible_edges() * (target_saturation / 100))
-        while self.edge_count() < target_edges:
-            u, v = random.sample(range(self.n), 2)
-            self.add_edge(u, v)
+        if mode == "sample":
+            for u, v in sample_missing_pairs(self.n, target_edges - self.m, self.adj, self.m):
+                self.add_edge(u, v)
+        elif mode == "random":
+            while self.m < target_edges:
+                u, v = random.sample(range(self.n), 2)
+                self.add_edge(u, v)
+        else:
+            raise ValueError(f"Unknown fill mode: {mode}")
 
     def isolate_node(self):
         # Isolate node 0 by removing all its edges
         for neighbor in list(self.adj[0]):
-            self.adj[neighbor].remove(0)
-        self.adj[0] = set()
+            self.remove_edge(0, neighbor)
+
+    def freeze(self) -> CompactGraph:
+        return freeze(self)
 
-    def find_euler_cycle(self):
+    def find_euler_cycle(self, stream=None):
         if not self.degree_even():
             print("Euler cycle does not exist: not all degrees are even.")
             return
-
-        graph_copy = {u: set(v) for u, v in self.adj.items()}
-        stack = [0]
-        path = []
-
-        while stack:
-            u = stack[-1]
-            if graph_copy[u]:
-                v = graph_copy[u].pop()
-                graph_copy[v].remove(u)
-                stack.append(v)
-            else:
-                path.append(stack.pop())
+        if not self.freeze().edges_connected():
+            print("Euler cycle does not exist: edges are not connected.")
+            return
 
         print("Euler cycle:")
-        print(" -> ".join(map(str, path[::-1])))
-
-    def find_hamilton_cycle(self):
-        path = []
-
-        def backtrack(v, visited):
-            if len(path) == self.n:
-                if path[0] in self.adj[path[-1]]:
-                    path.append(path[0])
-                    return True
-                return False
-
-            for neighbor in self.adj[v]:
-                if not visited[neighbor]:
-                    visited[neighbor] = True
-                    path.append(neighbor)
-                    if backtrack(neighbor, visited):
-                        return True
-                    visited[neighbor] = False
-                    path.pop()
-
-            return False
-
-        for start in range(self.n):
-            visited = [False] * self.n
-            path = [start]
-            visited[start] = True
-            if backtrack(start, visited):
-                print("Hamilton cycle:")
-                print(" -> ".join(map(str, path)))
-                return
-        print("No Hamilton cycle found.")
+        euler.write_euler_cycle(self, stream or sys.stdout)
+
+    def find_hamilton_cycle(self, method="auto", time_limit=None, progress=None):
+        result = hamilton.search(self, method, time_limit=time_limit, progress=progress)
+        if result.status == hamilton.FOUND:
+            print("Hamilton cycle:")
+            print(" -> ".join(map(str, result.cycle)))
+        elif result.status == hamilton.UNKNOWN:
+            print(f"Hamilton cycle search gave up after {result.stats.elapsed:.2f}s "
+                  f"({result.stats.nodes} nodes expanded).")
+        else:
+            print("No Hamilton cycle found.")
+        return result
 
 def main():
     parser = argparse.ArgumentParser()
@@ -111,6 +143,8 @@ def main():
     parser.add_argument('--non-hamilton', action='store_true')
     parser.add_argument('--nodes', type=int, required=True)
     parser.add_argument('--saturation', type=int, required=False)
+    parser.add_argument('--method', choices=['auto', *hamilton.METHODS], default='auto')
+    parser.add_argument('--time-limit', type=float, required=False)
     args = parser.parse_args()
 
     g = Graph(args.nodes)
@@ -135,7 +169,7 @@ def main():
 
     print("\nOperacje na grafie:")
     g.find_euler_cycle()
-    g.find_hamilton_cycle()
+    g.find_hamilton_cycle(args.method, args.time_limit)
 
 if __name__ == "__main__":
     main()
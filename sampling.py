@@ -0,0 +1,61 @@
+import math
+import random
+from typing import Iterator, Mapping, Set, Tuple
+
+
+def pair_count(n: int) -> int:
+    return n * (n - 1) // 2
+
+
+def pair_from_index(index: int) -> Tuple[int, int]:
+    # Porządek kolex: para (u, v), u < v, ma indeks v * (v - 1) / 2 + u.
+    v = (1 + math.isqrt(1 + 8 * index)) // 2
+    return index - v * (v - 1) // 2, v
+
+
+def pair_index(u: int, v: int) -> int:
+    if u > v:
+        u, v = v, u
+    return v * (v - 1) // 2 + u
+
+
+def sample_missing_pairs(n: int, k: int, adjacency: Mapping[int, Set[int]],
+                         existing_edges: int) -> Iterator[Tuple[int, int]]:
+    # Losuje bez zwracania dokładnie k par (u, v) spośród nieistniejących krawędzi
+    # grafu o wierzchołkach 0..n-1.
+    total = pair_count(n)
+    missing = total - existing_edges
+    k = min(k, missing)
+    if k <= 0:
+        return
+
+    if 2 * k <= missing and 4 * missing >= total:
+        # Rzadkie dopełnianie: losowanie indeksów par z odrzucaniem, akceptacja >= 1/8.
+        chosen = set()
+        while len(chosen) < k:
+            index = random.randrange(total)
+            if index in chosen:
+                continue
+            u, v = pair_from_index(index)
+            if v in adjacency.get(u, ()):
+                continue
+            chosen.add(index)
+            yield u, v
+        return
+
+    # Gęste dopełnianie: próbkowanie selekcyjne po wierszach dopełnienia. Luki
+    # między posortowanymi sąsiadami v > u dają brakujące pary wprost, więc koszt
+    # to O(n + m log n + liczba brakujących par) czasu i O(n) pamięci.
+    needed = k
+    remaining = missing
+    for u in range(n):
+        start = u + 1
+        for w in sorted(v for v in adjacency.get(u, ()) if v > u) + [n]:
+            for v in range(start, w):
+                if random.random() * remaining < needed:
+                    yield u, v
+                    needed -= 1
+                    if needed == 0:
+                        return
+                remaining -= 1
+            start = w + 1
@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import functools
+import io
+import itertools
+import json
+import os
+import random
+import shutil
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import compact_graph
+import euler
+import generowanie_grafu
+import graph_format
+import graph_import
+import hamilton
+from batch import HAMILTON_SHARE
+
+# Protokół: jedna linia JSON na żądanie {"id", "op", ...} i jedna na odpowiedź
+# {"id", "ok", "result"} albo {"id", "ok": false, "error"}. Grafy żyją w pamięci
+# serwera pod identyfikatorem; procesy robocze dostają je przez pliki graph_format
+# mapowane w pamięć, więc graf nie jest serializowany przy każdym żądaniu.
+DEFAULT_TIMEOUT = 60.0
+WORKER_GRAPHS = 8
+
+_worker_graphs = OrderedDict()
+
+
+def _worker_graph(path: str):
+    g = _worker_graphs.get(path)
+    if g is None:
+        g = _worker_graphs[path] = graph_format.load_graph(path)
+        if len(_worker_graphs) > WORKER_GRAPHS:
+            _worker_graphs.popitem(last=False)
+    else:
+        _worker_graphs.move_to_end(path)
+    return g
+
+
+def _summary(g) -> dict:
+    return {"n": g.n, "edges": g.edge_count(), "base": g.base, "metadata": g.metadata}
+
+
+def _generate_job(path: str, n: int, saturation: float, mode: str, seed) -> dict:
+    random.seed(seed)
+    g = compact_graph.freeze(generowanie_grafu.generowanie(n, saturation, mode))
+    graph_format.save_graph(g, path, seed=seed, saturation=saturation, mode=mode)
+    return _summary(_worker_graph(path))
+
+
+def _import_job(path: str, source: str, fmt) -> dict:
+    graph_format.save_graph(graph_import.import_graph(source, fmt), path)
+    return _summary(_worker_graph(path))
+
+
+def _euler_job(path: str):
+    g = _worker_graph(path)
+    return list(euler.iter_euler_cycle(g)) if g.is_eulerian() else None
+
+
+def _hamilton_job(path: str, method: str, time_limit, certificate) -> dict:
+    result = hamilton.search(_worker_graph(path), method, time_limit=time_limit, certificate=certificate)
+    return {"status": result.status, "cycle": result.cycle, "reason": result.reason,
+            "stats": result.stats.as_dict()}
+
+
+def _request_timeout(request: dict, default):
+    # Brak klucza - limit serwera; null - bez limitu.
+    timeout = request.get("timeout", default)
+    if timeout is None:
+        return None
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise ValueError(f"Niepoprawny limit czasu: {timeout!r} (oczekiwano liczby dodatniej albo null)")
+    return timeout
+
+
+class GraphService:
+    def __init__(self, workers=None, timeout: float = DEFAULT_TIMEOUT, directory=None):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.timeout = timeout
+        self.directory = directory or tempfile.mkdtemp(prefix="aisd-graphs-")
+        self.owns_directory = directory is None
+        self.graphs = {}
+        self.ids = itertools.count(1)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        if self.owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _new_path(self):
+        graph_id = f"g{next(self.ids)}"
+        return graph_id, os.path.join(self.directory, graph_id + ".graph")
+
+    def _entry(self, request: dict) -> dict:
+        graph_id = request.get("graph")
+        if graph_id not in self.graphs:
+            raise KeyError(f"Nieznany graf: {graph_id}")
+        return self.graphs[graph_id]
+
+    def _local_graph(self, entry: dict):
+        if entry["graph"] is None:
+            entry["graph"] = graph_format.load_graph(entry["path"])
+        return entry["graph"]
+
+    async def _in_pool(self, timeout, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(self.pool, fn, *args), timeout)
+
+    async def handle(self, request: dict):
+        op = request.get("op")
+        timeout = _request_timeout(request, self.timeout)
+        if op == "generate":
+            graph_id, path = self._new_path()
+            summary = await self._in_pool(timeout, _generate_job, path, request["n"],
+                                          request.get("saturation", 50) / 100, request.get("mode", "hamil"),
+                                          request.get("seed"))
+            self.graphs[graph_id] = {"path": path, "graph": None}
+            return dict(summary, graph=graph_id)
+        if op == "import":
+            graph_id, path = self._new_path()
+            summary = await self._in_pool(timeout, _import_job, path, request["path"], request.get("format"))
+            self.graphs[graph_id] = {"path": path, "graph": None}
+            return dict(summary, graph=graph_id)
+        if op == "load":
+            # Plik graph_format jest współdzielony wprost - bez kopiowania.
+            graph_id = f"g{next(self.ids)}"
+            g = graph_format.load_graph(request["path"])
+            self.graphs[graph_id] = {"path": os.path.abspath(request["path"]), "graph": g}
+            return dict(_summary(g), graph=graph_id)
+        if op == "list":
+            return sorted(self.graphs)
+        if op == "drop":
+            entry = self._entry(request)
+            del self.graphs[request["graph"]]
+            if entry["path"].startswith(self.directory):
+                os.remove(entry["path"])
+            return True
+        if op == "represent":
+            g = self._local_graph(self._entry(request))
+            return await asyncio.wait_for(asyncio.to_thread(_represent, g, request.get("kind", "edge_list"),
+                                                            request.get("fmt", "dense")), timeout)
+        if op == "euler":
+            return await self._in_pool(timeout, _euler_job, self._entry(request)["path"])
+        if op == "hamilton":
+            return await self._in_pool(timeout, _hamilton_job, self._entry(request)["path"],
+                                       request.get("method", "auto"), None if timeout is None else timeout * HAMILTON_SHARE,
+                                       "auto" if request.get("certificate") else None)
+        raise ValueError(f"Nieznana operacja: {op}")
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Żądania jednego klienta obsługiwane współbieżnie; odpowiedzi mogą przyjść
+        # w innej kolejności niż żądania, więc niosą ich "id". Rozłączenie anuluje
+        # wszystkie niedokończone żądania klienta.
+        pending = {}
+        lock = asyncio.Lock()
+
+        async def respond(message: dict):
+            async with lock:
+                if writer.is_closing():
+                    return
+                writer.write(json.dumps(message).encode("utf-8") + b"\n")
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+
+        def done(request_id, task: asyncio.Task):
+            # Anulowane żądanie nie odpowiada samo (mogło jeszcze nie wystartować).
+            # Zadanie już wysłane do puli procesów i tak dobiega końca; wyszukiwanie
+            # Hamiltona ogranicza jego własny budżet czasu.
+            if task.cancelled():
+                pending.pop(request_id, None)
+                asyncio.ensure_future(respond({"id": request_id, "ok": False, "error": "anulowano"}))
+
+        async def run(request_id, request: dict):
+            try:
+                result = await self.handle(request)
+                await respond({"id": request_id, "ok": True, "result": result})
+            except asyncio.TimeoutError:
+                await respond({"id": request_id, "ok": False, "error": "przekroczono limit czasu"})
+            except Exception as e:
+                await respond({"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"})
+            finally:
+                pending.pop(request_id, None)
+
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await respond({"id": None, "ok": False, "error": f"Niepoprawny JSON: {e}"})
+                    continue
+                request_id = request.get("id")
+                if request.get("op") == "cancel":
+                    task = pending.get(request.get("request"))
+                    if task is not None:
+                        task.cancel()
+                    await respond({"id": request_id, "ok": True, "result": task is not None})
+                    continue
+                task = pending[request_id] = asyncio.create_task(run(request_id, request))
+                task.add_done_callback(functools.partial(done, request_id))
+        finally:
+            for task in list(pending.values()):
+                task.cancel()
+            writer.close()
+
+
+def _represent(g, kind: str, fmt: str):
+    if kind == "edge_list":
+        return g.get_edge_list()
+    if kind == "adjacency_list":
+        return g.get_adjacency_list()
+    if kind in ("adjacency_matrix", "incidence_matrix"):
+        out = io.StringIO()
+        if kind == "adjacency_matrix":
+            g.get_adjacency_matrix(out)
+        else:
+            g.get_incidence_matrix(out, fmt)
+        return out.getvalue()
+    raise ValueError(f"Nieznana reprezentacja: {kind}")
+
+
+async def serve(service: GraphService, socket_path=None, host="127.0.0.1", port=8765):
+    if socket_path:
+        server = await asyncio.start_unix_server(service.serve_client, path=socket_path)
+    else:
+        server = await asyncio.start_server(service.serve_client, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokalna usługa generowania i rozwiązywania grafów (JSON w liniach).")
+    parser.add_argument("--socket", help="Ścieżka gniazda uniksowego (domyślnie TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, help="Liczba procesów roboczych")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Domyślny limit czasu żądania")
+    args = parser.parse_args()
+
+    service = GraphService(args.workers, args.timeout)
+    try:
+        asyncio.run(serve(service, args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
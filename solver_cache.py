@@ -0,0 +1,109 @@
+import hashlib
+import os
+import pickle
+import struct
+import weakref
+from array import array
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+import compact_graph
+import euler
+import hamilton
+
+# Cykl Eulera zapamiętywany jest jako array('i') tylko do tej liczby krawędzi;
+# dla większych grafów jest wypisywany strumieniem, jak bez cache.
+EULER_CACHE_EDGES = 4_000_000
+
+
+def fingerprint(graph) -> str:
+    # Kanoniczny skrót zbioru krawędzi: CSR ma posortowane wiersze, więc ten sam
+    # graf (te same etykiety wierzchołków) daje zawsze te same bajty.
+    g = compact_graph.freeze(graph)
+    h = hashlib.sha256(struct.pack("<qq", g.n, g.base))
+    h.update(array('q', g.offsets).tobytes())
+    h.update(array('i', g.targets).tobytes())
+    return h.hexdigest()
+
+
+class SolverCache:
+    def __init__(self, max_entries: int = 128, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Odcisk liczony raz na wersję grafu; graf bez licznika version (CompactGraph)
+        # jest niezmienny.
+        self._fingerprints = weakref.WeakKeyDictionary()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def fingerprint(self, graph) -> str:
+        version = getattr(graph, "version", 0)
+        known = self._fingerprints.get(graph)
+        if known is not None and known[0] == version:
+            return known[1]
+        fp = fingerprint(graph)
+        if known is not None and known[1] != fp:
+            self.invalidate(known[1])
+        self._fingerprints[graph] = (version, fp)
+        return fp
+
+    def invalidate(self, fp: str):
+        # Tylko warstwa w pamięci: pliki na dysku są adresowane treścią grafu,
+        # więc pozostają poprawne dla każdego grafu o tym samym odcisku.
+        for key in [key for key in self.entries if key[0] == fp]:
+            del self.entries[key]
+
+    def _path(self, key) -> str:
+        name = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name + ".pickle")
+
+    def get_or_compute(self, graph, kind: str, compute: Callable, *params, store: Callable = None):
+        key = (self.fingerprint(graph), kind, params)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.directory and os.path.exists(self._path(key)):
+            with open(self._path(key), "rb") as f:
+                value = pickle.load(f)
+            self.hits += 1
+        else:
+            self.misses += 1
+            value = compute()
+            if store is not None and not store(value):
+                return value
+            if self.directory:
+                path = self._path(key)
+                with open(path + ".tmp", "wb") as f:
+                    pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(path + ".tmp", path)
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return value
+
+    def euler_cycle(self, graph) -> Optional[Iterable[int]]:
+        g = compact_graph.freeze(graph)
+        if not g.is_eulerian():
+            return None
+        if g.edge_count() > EULER_CACHE_EDGES:
+            return euler.iter_euler_cycle(g)
+        return self.get_or_compute(graph, "euler", lambda: array('i', euler.iter_euler_cycle(g)))
+
+    def hamilton(self, graph, method: str = "auto", time_limit: Optional[float] = None,
+                 progress=None) -> "hamilton.HamiltonResult":
+        # Zapamiętywane tylko wyniki rozstrzygnięte - "unknown" zależy od budżetu.
+        # Metoda nie wchodzi do klucza: każdy znaleziony cykl jest równie dobry.
+        return self.get_or_compute(
+            graph, "hamilton",
+            lambda: hamilton.search(graph, method, time_limit=time_limit, progress=progress),
+            store=lambda result: result.status != hamilton.UNKNOWN)
+
+    def representation(self, graph, name: str, compute: Callable):
+        return self.get_or_compute(graph, "repr:" + name, compute)
+
+
+default_cache = SolverCache()
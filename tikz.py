@@ -0,0 +1,76 @@
+import bz2
+import gzip
+import lzma
+import math
+import random
+from typing import Iterator, Optional, TextIO, Tuple
+
+import compact_graph
+
+HEADER = """\\documentclass{standalone}
+    \\usepackage{tikz}
+    \\begin{document}
+    \\begin{tikzpicture}[every node/.style={draw, circle, thick, minimum size=7mm}]
+    """
+FOOTER = """\\end{tikzpicture}
+    \\end{document}
+    """
+
+_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def _positions(g, layout: str) -> Iterator[Tuple[int, float, float]]:
+    if layout == "circle":
+        angle_step = 2 * math.pi / g.n
+        for i, v in enumerate(g.vertices()):
+            yield v, 5 * math.cos(i * angle_step), 5 * math.sin(i * angle_step)
+    elif layout == "grid":
+        # Siatka zbliżona do kwadratu, 1.5 jednostki między węzłami.
+        side = math.isqrt(g.n - 1) + 1 if g.n else 1
+        for i, v in enumerate(g.vertices()):
+            yield v, 1.5 * (i % side), -1.5 * (i // side)
+    else:
+        raise ValueError(f"Nieznany układ: {layout}")
+
+
+def _edges(g, max_edges: Optional[int], rng: random.Random) -> Iterator[Tuple[int, int]]:
+    # Krawędzie z trójkąta górnego w jednym przejściu; przy limicie wybierane
+    # losowo bez zwracania (próbkowanie selekcyjne, stała pamięć).
+    needed = g.edge_count() if max_edges is None else min(max_edges, g.edge_count())
+    remaining = g.edge_count()
+    for u in g.vertices():
+        for v in g.neighbors(u):
+            if v <= u:
+                continue
+            if needed == remaining or rng.random() * remaining < needed:
+                yield u, v
+                needed -= 1
+                if not needed:
+                    return
+            remaining -= 1
+
+
+def write_tikz(graph, stream: TextIO, max_edges: Optional[int] = None,
+               layout: str = "circle", seed: Optional[int] = None) -> int:
+    g = compact_graph.freeze(graph)
+    stream.write(HEADER)
+    if g.n:
+        stream.writelines(f"  \\node ({v}) at ({x:.2f},{y:.2f}) {{{v}}};\n"
+                          for v, x, y in _positions(g, layout))
+    drawn = 0
+    for u, v in _edges(g, max_edges, random.Random(seed)):
+        stream.write(f"  \\draw[thick] ({u}) -- ({v});\n")
+        drawn += 1
+    stream.write(FOOTER)
+    return drawn
+
+
+def export_tikz(graph, filename: str, max_edges: Optional[int] = None,
+                layout: str = "circle", seed: Optional[int] = None) -> int:
+    # Kompresja wybierana po rozszerzeniu: .gz, .bz2 albo .xz.
+    for suffix, opener in _OPENERS.items():
+        if filename.endswith(suffix):
+            with opener(filename, "wt") as f:
+                return write_tikz(graph, f, max_edges, layout, seed)
+    with open(filename, "w") as f:
+        return write_tikz(graph, f, max_edges, layout, seed)
@@ -0,0 +1,46 @@
+from array import array
+from typing import Iterable, Tuple
+
+
+class DisjointSet:
+    # Zbiory rozłączne na etykietach base..base+size-1: łączenie według rozmiaru
+    # i skracanie ścieżek przez połowienie, więc zapytania kosztują O(α(n)).
+    def __init__(self, size: int, base: int = 0):
+        self.base = base
+        self.parent = array('i', range(size))
+        self.size = array('i', [1]) * size
+        self.count = size
+
+    @classmethod
+    def from_edges(cls, size: int, edges: Iterable[Tuple[int, int]], base: int = 0) -> "DisjointSet":
+        dsu = cls(size, base)
+        for u, v in edges:
+            dsu.union(u, v)
+        return dsu
+
+    def _root(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def find(self, x: int) -> int:
+        return self._root(x - self.base) + self.base
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self._root(a - self.base), self._root(b - self.base)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        self.count -= 1
+        return True
+
+    def connected(self, a: int, b: int) -> bool:
+        return self._root(a - self.base) == self._root(b - self.base)
+
+    def component_size(self, x: int) -> int:
+        return self.size[self._root(x - self.base)]
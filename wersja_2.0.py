@@ -1,5 +1,18 @@
 import argparse
+import contextlib
+import sys
+import random
 import generowanie_grafu
+import graph_format
+import graph_import
+import solver_cache
+
+# Górny limit jednego wyszukiwania cyklu Hamiltona, żeby nie blokować pętli akcji.
+LIMIT_HAMILTONA = 60.0
+
+def pokaz_postep(stats):
+    print(f"  ... {stats}", flush=True)
+
 def get_integer_input(prompt):
     while True:
         try:
@@ -12,8 +25,18 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('--hamilton', action='store_true', help='Generuj graf Hamiltonowski')
     group.add_argument('--non-hamilton', action='store_true', help='Generuj graf nie-Hamiltonowski')
+    group.add_argument('--load', metavar='PLIK', help='Wczytaj graf zapisany akcją save')
+    group.add_argument('--import', dest='import_file', metavar='PLIK',
+                       help='Importuj graf z listy krawędzi, DIMACS lub HCP')
+    parser.add_argument('--seed', type=int, help='Ziarno generatora liczb losowych')
+    parser.add_argument('--cache-dir', metavar='KATALOG', help='Katalog dyskowej pamięci podręcznej wyników')
     args = parser.parse_args()
 
+    if args.seed is not None:
+        random.seed(args.seed)
+    metadane = {"seed": args.seed}
+    cache = solver_cache.SolverCache(directory=args.cache_dir)
+
     if args.hamilton:
         nodes = get_integer_input("Liczba wierzchołków > ")
         saturation = get_integer_input("Nasycenie (30 lub 70)> ")
@@ -23,6 +46,7 @@ def main():
             saturation = get_integer_input("Nasycenie (30 lub 70)> ")
 
         graph = generowanie_grafu.generowanie(nodes, saturation/100, "hamil")
+        metadane.update(saturation=saturation/100, mode="hamil")
 
     elif args.non_hamilton:
         nodes = get_integer_input("Liczba wierzchołków > ")
@@ -30,12 +54,22 @@ def main():
             print("Wierzchołków musi być większa od 10:")
             nodes = get_integer_input("Liczba wierzchołków > ")
         graph = generowanie_grafu.generowanie(nodes, 0.5, "non-hamil")
+        metadane.update(saturation=0.5, mode="non-hamil")
+
+    elif args.load:
+        graph = graph_format.load_graph(args.load)
+        metadane = graph.metadata
+
+    elif args.import_file:
+        graph = graph_import.import_graph(args.import_file)
+        metadane = graph.metadata
 
     print("\nDostępne operacje na grafie:")
     print("  print      - Wypisz reprezentację grafu")
     print("  euler      - Znajdź cykl Eulera")
     print("  hamilton   - Znajdź cykl Hamiltona")
     print("  export     - Eksportuj do TikZ")
+    print("  save       - Zapisz graf do pliku binarnego")
     print("  exit       - Zakończ program")
 
     while True:
@@ -43,27 +77,36 @@ def main():
             action = input("action> ").strip().lower()
             match action:
                 case "print":
-                    rep = input("Reprezentacja (macierz_sasiedz / macierz_incy / list_krawe / lista_sasiedz) > ").strip().lower()
-                    match rep:
-                        case "macierz_sasiedz":
-                            print(graph.get_adjacency_matrix())
-                        case "macierz_incy":
-                            print(graph.get_incidence_matrix())
-                        case "list_krawe":
-                            print(graph.get_edge_list())
-                        case "lista_sasiedz":
-                            print(graph.get_adjacency_list())
-                        case _:
-                            print("Nieznany typ reprezentacji.")
+                    rep = input("Reprezentacja (macierz_sasiedz / macierz_incy / macierz_incy_rzadka / list_krawe / lista_sasiedz) > ").strip().lower()
+                    plik = input("Plik wyjściowy (puste = ekran) > ").strip()
+                    with (open(plik, "w") if plik else contextlib.nullcontext(sys.stdout)) as out:
+                        match rep:
+                            case "macierz_sasiedz":
+                                graph.get_adjacency_matrix(out)
+                            case "macierz_incy":
+                                graph.get_incidence_matrix(out)
+                            case "macierz_incy_rzadka":
+                                graph.get_incidence_matrix(out, fmt="csr")
+                            case "list_krawe":
+                                print(cache.representation(graph, rep, graph.get_edge_list), file=out)
+                            case "lista_sasiedz":
+                                print(cache.representation(graph, rep, graph.get_adjacency_list), file=out)
+                            case _:
+                                print("Nieznany typ reprezentacji.")
 
                 case "euler":
-                    graph.find_euler_cycle()
+                    graph.find_euler_cycle(cache=cache)
 
                 case "hamilton":
-                    graph.find_hamilton_cycle()
+                    graph.find_hamilton_cycle(time_limit=LIMIT_HAMILTONA, progress=pokaz_postep, cache=cache)
 
                 case "export":
-                    graph.export_to_tikz()
+                    plik = input("Plik .tex (puste = ekran, .gz/.bz2/.xz = kompresja) > ").strip()
+                    graph.export_to_tikz(plik or None)
+
+                case "save":
+                    plik = input("Plik > ").strip()
+                    graph_format.save_graph(graph, plik, **metadane)
 
                 case "exit":
                     break